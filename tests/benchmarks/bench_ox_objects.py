@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Micro-benchmark of the construction of OX objects, as done for every
+object returned by list() (e.g. by update-ox-db-cache --build-cache). Does
+not need OX: the SOAP service is replaced by a dummy.
+"""
+
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from types import SimpleNamespace
+
+from univention.ox.soap.backend import SoapBackend
+from univention.ox.soap.backend_base import get_ox_integration_class
+from univention.ox.soap.config import DEFAULT_CONTEXT
+
+User = get_ox_integration_class("SOAP", "User")
+
+
+def soap_users(num):
+    """Objects as returned by OX for num users"""
+    users = []
+    for i in range(num):
+        attrs = {attr.name: None for attr in User._base2soap.values()}
+        attrs.update(
+            id=i,
+            name=f"user{i}",
+            display_name=f"User {i}",
+            given_name="Jane",
+            sur_name=f"Doe{i}",
+            email1=f"user{i}@example.org",
+            primaryEmail=f"user{i}@example.org",
+            aliases=[f"user{i}@example.org"],
+            language="de_DE",
+            timezone="Europe/Berlin",
+        )
+        users.append(SimpleNamespace(**attrs))
+    return users
+
+
+def bench(users, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for soap_obj in users:
+            User._soap_obj2base_obj(10, soap_obj)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    tracemalloc.start()
+    objs = [User._soap_obj2base_obj(10, soap_obj) for soap_obj in users]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return best, size
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark of the construction of OX users")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for context_id in (DEFAULT_CONTEXT, 10):
+        SoapBackend._service_objs.setdefault("User", {})[context_id] = object()
+    duration, size = bench(soap_users(args.users), args.repeat)
+    print(
+        f"{duration:.2f}s for {args.users} users "
+        f"({duration / args.users * 1e6:.1f}µs per user), "
+        f"{size / args.users:.0f} bytes per user"
+    )
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Benchmark of synchronous and asynchronous SOAP calls against a local
+stand-in for the OX SOAP server, which answers after a configurable latency
+(like an OX in another data center). The stand-in runs in its own process,
+so that it does not compete with the benchmarked client for the GIL.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_soap_pooling import StandInHandler, StandInServer
+from zeep.transports import Transport
+
+from univention.ox.soap.async_services import (
+    close_async_transport,
+    get_async_client,
+    get_async_transport,
+)
+from univention.ox.soap.services import create_client, get_session
+
+
+class SlowStandInHandler(StandInHandler):
+    latency = 0.0
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        super().do_POST()
+
+
+def serve(latency, queue):
+    SlowStandInHandler.latency = latency
+    server = StandInServer(("127.0.0.1", 0), SlowStandInHandler)
+    queue.put("{}://{}:{}".format(server.scheme, *server.server_address))
+    server.serve_forever()
+
+
+def bench_sync(server, calls, workers):
+    transport = Transport(session=get_session(pool_size=workers))
+    service = create_client(server, "User", transport=transport).service
+    start = time.perf_counter()
+    if workers == 1:
+        for i in range(calls):
+            assert service.exists(name=f"user{i}") is True
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(
+                lambda i: service.exists(name=f"user{i}"), range(calls)
+            ):
+                assert result is True
+    return calls / (time.perf_counter() - start)
+
+
+async def bench_async(server, calls, concurrency):
+    get_async_transport(pool_size=concurrency)
+    service = get_async_client(server, "User").service
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(i):
+        async with semaphore:
+            return await service.exists(name=f"user{i}")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[call(i) for i in range(calls)])
+    rate = calls / (time.perf_counter() - start)
+    assert all(result is True for result in results)
+    await close_async_transport()
+    return rate
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark of sync and async SOAP calls")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds until the answer"
+    )
+    args = parser.parse_args()
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(args.latency, queue))
+    process.start()
+    url = queue.get()
+    rate = bench_sync(url, args.calls, 1)
+    print(f"sync, one call after the other: {rate:.0f} calls/s")
+    rate = bench_sync(url, args.calls, args.concurrency)
+    print(f"sync, {args.concurrency} threads: {rate:.0f} calls/s")
+    rate = asyncio.run(bench_async(url, args.calls, args.concurrency))
+    print(f"async, {args.concurrency} concurrent calls: {rate:.0f} calls/s")
+    process.terminate()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Benchmark of SOAP calls with and without reusing HTTP connections, against
+a local stand-in for the OX SOAP server. With --tls, the stand-in uses HTTPS
+with a temporary self-signed certificate (needs the openssl command).
+"""
+
+import ssl
+import subprocess
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+import urllib3
+from zeep import Client
+from zeep.transports import Transport
+
+from univention.ox.soap.services import get_session
+
+WSDL = """<?xml version="1.0"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:tns="http://soap.admin.openexchange.com"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    targetNamespace="http://soap.admin.openexchange.com">
+  <types>
+    <xsd:schema targetNamespace="http://soap.admin.openexchange.com"
+        elementFormDefault="qualified">
+      <xsd:element name="exists">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="name" type="xsd:string"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+      <xsd:element name="existsResponse">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="return" type="xsd:boolean"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+    </xsd:schema>
+  </types>
+  <message name="existsRequest"><part name="parameters" element="tns:exists"/></message>
+  <message name="existsResponse">
+    <part name="parameters" element="tns:existsResponse"/>
+  </message>
+  <portType name="OXUserServicePortType">
+    <operation name="exists">
+      <input message="tns:existsRequest"/><output message="tns:existsResponse"/>
+    </operation>
+  </portType>
+  <binding name="OXUserServiceBinding" type="tns:OXUserServicePortType">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <operation name="exists">
+      <soap:operation soapAction="urn:exists"/>
+      <input><soap:body use="literal"/></input><output><soap:body use="literal"/></output>
+    </operation>
+  </binding>
+  <service name="OXUserService">
+    <port name="OXUserServiceHttpEndpoint" binding="tns:OXUserServiceBinding">
+      <soap:address location="{address}"/>
+    </port>
+  </service>
+</definitions>
+"""
+
+RESPONSE = b"""<?xml version="1.0"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+  <soapenv:Body>
+    <ns:existsResponse xmlns:ns="http://soap.admin.openexchange.com">
+      <ns:return>true</ns:return>
+    </ns:existsResponse>
+  </soapenv:Body>
+</soapenv:Envelope>
+"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        address = "{}://{}:{}/webservices/OXUserService".format(
+            self.server.scheme, *self.server.server_address
+        )
+        self._send(WSDL.format(address=address).encode("utf-8"))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(RESPONSE)
+
+    def _send(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    scheme = "http"
+
+    def use_tls(self, tmp_dir):
+        cert = Path(tmp_dir, "cert.pem")
+        key = Path(tmp_dir, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+            + ["-subj", "/CN=127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+            check=True,
+            capture_output=True,
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        # handshake in the threads handling the connections, not in accept()
+        self.socket = context.wrap_socket(
+            self.socket, server_side=True, do_handshake_on_connect=False
+        )
+        self.scheme = "https"
+
+
+def bench(url, calls, workers, pool_size, keep_alive):
+    session = get_session(pool_size=pool_size, keep_alive=keep_alive)
+    session.verify = False  # self-signed certificate of the stand-in
+    session.trust_env = False  # or REQUESTS_CA_BUNDLE would override verify
+    client = Client(url, transport=Transport(session=session))
+    service = client.service
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(
+            lambda i: service.exists(name=f"user{i}"), range(calls)
+        ):
+            assert result is True
+    return calls / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark of connection reuse for SOAP calls")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--tls", action="store_true", help="Use HTTPS")
+    args = parser.parse_args()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.tls:
+            server.use_tls(tmp_dir)
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = "{}://{}:{}/webservices/OXUserService?wsdl".format(
+            server.scheme, *server.server_address
+        )
+        for description, pool_size, keep_alive in [
+            ("new connection per call", args.workers, False),
+            ("pool smaller than workers", 1, True),
+            ("pool of workers' size", args.workers, True),
+        ]:
+            rate = bench(url, args.calls, args.workers, pool_size, keep_alive)
+            print(f"{description}: {rate:.0f} calls/s")
+        server.shutdown()
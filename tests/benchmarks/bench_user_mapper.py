@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+Benchmark of the mapping of UDM users to OX users (update_user()) on
+synthetic users. Does not need OX or UDM.
+
+To compare with another version of the mapping, pass its users.py, e.g.:
+
+    git show HEAD~1:univention-ox-provisioning/univention/ox/provisioning/users.py > /tmp/users.py
+    python3 tests/benchmarks/bench_user_mapper.py --users-module /tmp/users.py
+"""
+
+import importlib.util
+import random
+import time
+from argparse import ArgumentParser
+from types import SimpleNamespace
+
+import univention.ox.provisioning.users
+
+
+def synthetic_users(num, seed=0):
+    rand = random.Random(seed)
+    users = []
+    for i in range(num):
+        attributes = {
+            "username": f"user{i}",
+            "firstname": "Jane",
+            "lastname": f"Doe{i}",
+            "oxDisplayName": f"Jane Doe{i}",
+            "mailPrimaryAddress": f"user{i}@example.org",
+            "mailAlternativeAddress": [f"alias{i}@example.org"],
+            "oxAccess": "premium",
+            "oxContext": 10,
+            "city": "Bremen",
+            "street": "Mary-Somerville-Str. 1",
+            "postcode": "28359",
+            "organisation": "Example Inc.",
+            "oxDepartment": "R&D",
+            "phone": [f"+49 421 {i}", "+49 421 0"],
+            "mobileTelephoneNumber": [f"+49 171 {i}"],
+            "roomNumber": [str(i % 500)],
+            "birthday": f"{rand.randint(1950, 2005)}-{rand.randint(1, 12):02d}-"
+            f"{rand.randint(1, 28):02d}",
+            "oxUserfield01": "x" * 10,
+        }
+        if i % 10 == 0:
+            attributes["oxAnniversary"] = "01.04.2010"
+        users.append(attributes)
+    return users
+
+
+def load_users_module(path):
+    spec = importlib.util.spec_from_file_location("users_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench(update_user, users, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for attributes in users:
+            # a plain object, the SOAP user would load the WSDL files
+            update_user(SimpleNamespace(), attributes)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark of update_user()")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--users-module", help="users.py to compare the installed version with"
+    )
+    args = parser.parse_args()
+    users = synthetic_users(args.users)
+    modules = [("installed", univention.ox.provisioning.users)]
+    if args.users_module:
+        modules.append((args.users_module, load_users_module(args.users_module)))
+    for name, module in modules:
+        duration = bench(module.update_user, users, args.repeat)
+        print(
+            f"{name}: {duration:.2f}s for {args.users} users "
+            f"({duration / args.users * 1e6:.1f}µs per user)"
+        )
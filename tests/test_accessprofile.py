@@ -1,3 +1,5 @@
+import subprocess
+
 import pytest
 
 from univention.ox.soap.backend_base import get_ox_integration_class
@@ -116,3 +118,69 @@ def test_every_one_right_access_profile(
     with open(fname) as fd:
         content = fd.read()
         assert f"{ox_access}={right}\n" not in content
+
+
+def test_unchanged_access_rights(
+    udm, default_ox_context, new_user_name, wait_for_listener, domainname
+):
+    """
+    The access rights of a user are only sent to OX if they change
+    """
+    ox_access = f"unchanged_{new_user_name}"
+    dn = create_obj(udm, ox_access, "webmail")
+    wait_for_listener(dn)
+    ox_access2 = f"changed_{new_user_name}"
+    dn2 = create_obj(udm, ox_access2, "calendar")
+    wait_for_listener(dn2)
+    user_dn = create_user(udm, new_user_name, domainname, default_ox_context, ox_access)
+    wait_for_listener(user_dn)
+    User = get_ox_integration_class("SOAP", "User")
+    obj = User.list(default_ox_context, pattern=new_user_name)[0]
+    access = find_access(default_ox_context, new_user_name)
+    assert access["webmail"] is True
+    print("Disabling webmail of", obj.id, "directly in OX")
+    access["webmail"] = False
+    obj.service(obj.context_id).change_by_module_access({"id": obj.id}, access)
+    udm.modify("users/user", user_dn, {"lastname": "Newman"})
+    wait_for_listener(user_dn)
+    access = find_access(default_ox_context, new_user_name)
+    assert access["webmail"] is False
+    udm.modify("users/user", user_dn, {"oxAccess": ox_access2})
+    wait_for_listener(user_dn)
+    access = find_access(default_ox_context, new_user_name)
+    assert access["webmail"] is False
+    assert access["calendar"] is True
+
+    udm.remove("users/user", user_dn)  # needs to be removed before accessprofile
+    udm.remove("oxmail/accessprofile", dn)
+    udm.remove("oxmail/accessprofile", dn2)
+    wait_for_listener(dn2)
+
+
+def test_propagate_access_profile(
+    udm, default_ox_context, new_user_name, wait_for_listener, domainname
+):
+    """
+    Changing an access profile leaves the users untouched.
+    propagate-access-profiles sets their new rights
+    """
+    ox_access = f"propagate_{new_user_name}"
+    dn = create_obj(udm, ox_access, "webmail")
+    wait_for_listener(dn)
+    user_dn = create_user(udm, new_user_name, domainname, default_ox_context, ox_access)
+    wait_for_listener(user_dn)
+    access = find_access(default_ox_context, new_user_name)
+    assert access["webmail"] is True
+    assert access["calendar"] is False
+    udm.modify("oxmail/accessprofile", dn, {"calendar": True})
+    wait_for_listener(dn)
+    access = find_access(default_ox_context, new_user_name)
+    assert access["calendar"] is False
+    subprocess.run(["propagate-access-profiles", ox_access], check=True)
+    access = find_access(default_ox_context, new_user_name)
+    assert access["webmail"] is True
+    assert access["calendar"] is True
+
+    udm.remove("users/user", user_dn)  # needs to be removed before accessprofile
+    udm.remove("oxmail/accessprofile", dn)
+    wait_for_listener(dn)
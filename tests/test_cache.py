@@ -1,30 +1,9 @@
-import dbm.gnu
-import json
-from contextlib import contextmanager
-from pathlib import Path
+import subprocess
 
 from univention.ox.soap.backend_base import User, get_ox_integration_class
+from univention.ox.provisioning.storage import OldObjectStore
 
-
-# copied from app/listener_trigger to test the cache dbs
-class KeyValueStore(object):
-    def __init__(self, name):
-        APP = "ox-connector"
-        DATA_DIR = Path("/var/lib/univention-appcenter/apps", APP, "data")
-        NEW_FILES_DIR = DATA_DIR / "listener"
-        self.db_fname = str(NEW_FILES_DIR / name)
-
-    @contextmanager
-    def open(self):
-        with dbm.gnu.open(self.db_fname, "r") as db:
-            yield db
-
-    def get(self, key):
-        with self.open() as db:
-            return db.get(key)
-
-
-mapping = KeyValueStore("old.db")  # stores dn -> path to last json file
+old_objects = OldObjectStore()  # state of each object after last processing
 
 
 def create_context(udm, ox_host, context_id, wait_for_listener) -> str:
@@ -75,14 +54,13 @@ def find_obj(context_id, name, assert_empty=False, print_obj=True) -> User:
 
 def get_db_id(dn: str) -> str:
     """
-    Tests existance of an old JSON file
+    Tests existance of an old object
     Returns the oxDbId (if any)
     """
-    old_file_path = mapping.get(dn)
-    if old_file_path is None:
+    obj = old_objects.get_by_dn(dn)
+    old_objects.close()
+    if obj is None:
         return None
-    with open(old_file_path) as fd:
-        obj = json.load(fd)
     return obj["object"].get("oxDbId")
 
 
@@ -178,3 +156,61 @@ def test_remove_user(
     wait_for_listener(dn)
     db_id = get_db_id(dn)
     assert db_id is None
+
+
+def test_add_and_remove_user(
+    new_context_id, new_user_name, udm, ox_host, domainname, wait_for_listener
+):
+    """
+    Test a user removed right after its creation (possibly handled as
+    one change). Should neither find a DB ID in cache nor the user in OX
+    """
+    create_context(udm, ox_host, new_context_id, wait_for_listener)
+    dn = create_user(udm, new_user_name, domainname, new_context_id)
+    udm.remove("users/user", dn)
+    wait_for_listener(dn)
+    db_id = get_db_id(dn)
+    assert db_id is None
+    find_obj(new_context_id, new_user_name, assert_empty=True)
+
+
+def test_user_index(
+    new_context_id, new_user_name, udm, ox_host, domainname, wait_for_listener
+):
+    """
+    Groups find the context and the ID of their members in the user index
+    """
+    create_context(udm, ox_host, new_context_id, wait_for_listener)
+    dn = create_user(udm, new_user_name, domainname, new_context_id)
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    index = old_objects.user_index([dn])
+    old_objects.close()
+    assert str(index[dn].context_id) == str(new_context_id)
+    assert index[dn].db_id == obj.id
+    assert index[dn].is_ox_user
+
+
+def test_unchanged_user(
+    udm, ox_host, new_context_id, new_user_name, domainname, wait_for_listener
+):
+    """
+    Changing only attributes of a user that OX does not know about
+    should not send anything to OX (the fingerprint did not change).
+    After resetting the fingerprint the next change sends everything
+    """
+    create_context(udm, ox_host, new_context_id, wait_for_listener)
+    dn = create_user(udm, new_user_name, domainname, new_context_id)
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    obj.given_name = "Leon"
+    obj.modify()
+    udm.modify("users/user", dn, {"description": "Not for OX"})
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    assert obj.given_name == "Leon"
+    subprocess.run(["ox-old-objects", "reset-fingerprints", dn], check=True)
+    udm.modify("users/user", dn, {"description": "Still not for OX"})
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    assert obj.given_name == "Emil"
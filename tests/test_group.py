@@ -1,4 +1,7 @@
 from univention.ox.soap.backend_base import get_ox_integration_class
+from univention.ox.provisioning.storage import OldObjectStore
+
+old_objects = OldObjectStore()  # state of each object after last processing
 
 
 def create_obj(udm, name, members, enabled=True):
@@ -22,6 +25,24 @@ def find_obj(context_id, name, assert_empty=False):
         return obj
 
 
+def find_user_id(context_id, name):
+    User = get_ox_integration_class("SOAP", "User")
+    objs = User.list(context_id, pattern=name)
+    assert len(objs) == 1
+    return objs[0].id
+
+
+def get_db_ids(dn):
+    """
+    Returns the stored IDs of the group in OX (context -> ID), if any
+    """
+    obj = old_objects.get_by_dn(dn)
+    old_objects.close()
+    if obj is None:
+        return None
+    return obj["object"].get("oxDbIds")
+
+
 def test_ignore_group(
     create_ox_user,
     default_ox_context,
@@ -231,6 +252,64 @@ def test_modify_group(
     assert len(obj.members) == 1
 
 
+def test_modify_group_members(
+    create_ox_user,
+    default_ox_context,
+    new_group_name,
+    udm,
+    wait_for_listener,
+):
+    """
+    Users joining and leaving the group in UDM should be reflected in OX
+    """
+    user1 = create_ox_user()
+    user2 = create_ox_user()
+    user3 = create_ox_user()
+    dn = create_obj(udm, new_group_name, [user1.dn, user2.dn])
+    wait_for_listener(dn)
+    udm.modify("groups/group", dn, {"users": [user2.dn, user3.dn]})
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_group_name)
+    assert sorted(obj.members) == sorted(
+        find_user_id(default_ox_context, user.properties["username"])
+        for user in (user2, user3)
+    )
+
+
+def test_modify_group_members_with_new_ids(
+    create_ox_user,
+    default_ox_context,
+    new_group_name,
+    udm,
+    wait_for_listener,
+):
+    """
+    Changing the members of a group compares them with the members sent
+    to OX the last time. A member that got its OX ID after that is sent
+    with the next change of the group
+    """
+    user1 = create_ox_user()
+    user2 = create_ox_user(enabled=False)
+    user3 = create_ox_user()
+    dn = create_obj(udm, new_group_name, [user1.dn, user2.dn])
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_group_name)
+    assert len(obj.members) == 1
+    # two steps, see test_enable_and_disable_user (Bug #50469)
+    udm.modify("users/user", user2.dn, {"isOxUser": True})
+    udm.modify("users/user", user2.dn, {"oxContext": default_ox_context})
+    wait_for_listener(user2.dn)
+    user2_id = find_user_id(default_ox_context, user2.properties["username"])
+    obj = find_obj(default_ox_context, new_group_name)
+    print("Removing", user2_id, "from", obj.id, "directly in OX")
+    obj.remove_members([user2_id])
+    udm.modify("groups/group", dn, {"users": [user1.dn, user2.dn, user3.dn]})
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_group_name)
+    assert user2_id in obj.members
+    assert len(obj.members) == 3
+
+
 def test_rename_user(
     create_ox_user,
     default_ox_context,
@@ -301,3 +380,40 @@ def test_remove_group(
     wait_for_listener(dn)
     find_obj(default_ox_context, new_group_name, assert_empty=True)
     find_obj(new_context_id, new_group_name, assert_empty=True)
+
+
+def test_group_recreated_in_ox(
+    create_ox_user,
+    default_ox_context,
+    new_group_name,
+    udm,
+    wait_for_listener,
+):
+    """
+    The connector stores the ID of the group in OX. If the group is
+    recreated in OX with another ID, the next change finds it by its name
+    and stores the new ID
+    """
+    user1 = create_ox_user()
+    user2 = create_ox_user()
+    dn = create_obj(udm, new_group_name, [user1.dn])
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_group_name)
+    assert get_db_ids(dn) == {str(default_ox_context): obj.id}
+    print("Recreating", obj.id, "directly in OX")
+    obj.remove()
+    Group = get_ox_integration_class("SOAP", "Group")
+    new_obj = Group(
+        context_id=default_ox_context,
+        name=new_group_name,
+        display_name=new_group_name,
+        members=obj.members,
+    )
+    new_obj.create()
+    assert new_obj.id != obj.id
+    udm.modify("groups/group", dn, {"users": [user1.dn, user2.dn]})
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_group_name)
+    assert obj.id == new_obj.id
+    assert len(obj.members) == 2
+    assert get_db_ids(dn) == {str(default_ox_context): new_obj.id}
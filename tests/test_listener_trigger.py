@@ -0,0 +1,223 @@
+import importlib.machinery
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+import univention.ox.provisioning.helpers as helpers
+
+pytest.importorskip("dbm.gnu")  # needed by the listener_trigger script
+
+SCRIPT_PATHS = [
+    Path(__file__).resolve().parents[1] / "app" / "listener_trigger",  # source tree
+    Path("/usr/local/share/ox-connector/listener_trigger"),  # container
+]
+
+
+@pytest.fixture(scope="module")
+def listener_trigger_module():
+    script = next((path for path in SCRIPT_PATHS if path.exists()), None)
+    if script is None:
+        pytest.skip("listener_trigger script not found")
+    # loading the script replaces these hooks
+    get_old_obj, get_user_index = helpers.get_old_obj, helpers.get_user_index
+    loader = importlib.machinery.SourceFileLoader("listener_trigger", str(script))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    yield module
+    helpers.get_old_obj, helpers.get_user_index = get_old_obj, get_user_index
+
+
+@pytest.fixture
+def listener_trigger(listener_trigger_module, tmp_path, monkeypatch):
+    """The listener_trigger script working on a queue in tmp_path"""
+    module = listener_trigger_module
+    monkeypatch.setattr(module, "NEW_FILES_DIR", tmp_path)
+    monkeypatch.setattr(module, "OLD_OBJECTS_DB", tmp_path / "old.sqlite")
+    monkeypatch.setattr(module, "meta", module.KeyValueStore("meta.db"))
+    monkeypatch.setattr(
+        module, "old_objects", module.OldObjectStore(tmp_path / "old.sqlite")
+    )
+    monkeypatch.setattr(module, "old_object_cache", module.OldObjectCache())
+    yield module
+    module.meta.close()
+    module.old_objects.close()
+
+
+def object_content(entry_uuid, object_type, deleted=False, **attributes):
+    return {
+        "id": entry_uuid,
+        "udm_object_type": object_type,
+        "dn": "cn={},dc=example,dc=com".format(entry_uuid),
+        "object": None if deleted else dict(attributes, name=entry_uuid),
+        "options": [],
+    }
+
+
+class Queue(object):
+    """Writes JSON files into the queue like the listener does"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.paths = []
+
+    def add(self, entry_uuid, object_type, deleted=False, **attributes):
+        path = self.directory / "{:06d}.json".format(len(self.paths))
+        content = object_content(entry_uuid, object_type, deleted, **attributes)
+        path.write_text(json.dumps(content))
+        self.paths.append(path)
+        return path
+
+    def remaining(self):
+        return sorted(self.directory.glob("*.json"))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return Queue(tmp_path)
+
+
+def objects_from_queue(listener_trigger, **kwargs):
+    """Reads the queue like process_queue does"""
+    return listener_trigger.objects_from_files(
+        delete_files=False, move_files=True, **kwargs
+    )
+
+
+def test_object_queue_order(listener_trigger, queue):
+    listener_trigger.old_objects.put(
+        object_content("context-deleted", "oxmail/oxcontext")
+    )
+    queue.add("group1", "groups/group")
+    queue.add("context-deleted", "oxmail/oxcontext", deleted=True)
+    queue.add("user1", "users/user")
+    queue.add("resource1", "oxresources/oxresources")
+    queue.add("context1", "oxmail/oxcontext")
+    queue.add("user2", "users/user")
+    queue.add("profile1", "oxmail/accessprofile")
+    queue.add("group2", "groups/group")
+    queue.add("account1", "oxmail/functional_account")
+    handled = [obj.entry_uuid for obj in objects_from_queue(listener_trigger)]
+    assert handled == [
+        "context1",
+        "profile1",
+        "user1",
+        "user2",
+        "group1",
+        "group2",
+        "account1",
+        "resource1",
+        "context-deleted",
+    ]
+    assert queue.remaining() == []
+    assert listener_trigger.old_objects.get("user1") is not None
+    assert listener_trigger.old_objects.get("context-deleted") is None
+
+
+def test_queue_is_read_in_windows(listener_trigger, queue, monkeypatch):
+    listener_trigger.old_objects.put(
+        object_content("context-deleted", "oxmail/oxcontext")
+    )
+    queue.add("user1", "users/user")
+    queue.add("context1", "oxmail/oxcontext")
+    queue.add("group1", "groups/group")
+    queue.add("user2", "users/user")
+    queue.add("context-deleted", "oxmail/oxcontext", deleted=True)
+    queue.add("user3", "users/user")
+    read_objects = listener_trigger.read_objects
+    windows = []
+
+    def recording_read_objects(paths, move_files):
+        windows.append([path.name for path in paths])
+        return read_objects(paths, move_files)
+
+    monkeypatch.setattr(listener_trigger, "read_objects", recording_read_objects)
+    handled = [
+        obj.entry_uuid for obj in objects_from_queue(listener_trigger, window_size=2)
+    ]
+    assert windows == [
+        ["000000.json", "000001.json"],
+        ["000002.json", "000003.json"],
+        ["000004.json", "000005.json"],
+    ]
+    # ordered within each window, only the deleted context is held back
+    assert handled == [
+        "context1",
+        "user1",
+        "user2",
+        "group1",
+        "user3",
+        "context-deleted",
+    ]
+    assert queue.remaining() == []
+
+
+def test_error_in_the_middle_of_a_window(listener_trigger, queue):
+    for idx in range(1, 6):
+        queue.add("user{}".format(idx), "users/user")
+
+    def fail_on_user2(obj):
+        if obj.entry_uuid == "user2":
+            raise RuntimeError("OX is not reachable")
+
+    objs = objects_from_queue(listener_trigger, window_size=3)
+    assert listener_trigger.run_on_files(objs, fail_on_user2) == -1
+    # user1 is done, the queue stops at the failing object
+    assert queue.remaining() == queue.paths[1:]
+    assert listener_trigger.old_objects.get("user1") is not None
+    assert listener_trigger.old_objects.get("user2") is None
+    assert listener_trigger.meta.get("errors") == b"1"
+
+    # the next run starts with the failing object
+    handled = []
+    objs = objects_from_queue(listener_trigger, window_size=3)
+    assert listener_trigger.run_on_files(objs, handled.append) == 4
+    assert [obj.entry_uuid for obj in handled] == ["user2", "user3", "user4", "user5"]
+    assert queue.remaining() == []
+    assert listener_trigger.meta.get("errors") == b"0"
+
+
+def test_changes_of_the_same_object_are_coalesced(listener_trigger, queue):
+    listener_trigger.old_objects.put(
+        object_content("user1", "users/user", description="old")
+    )
+    first = queue.add("user1", "users/user", description="first")
+    queue.add("group1", "groups/group")
+    second = queue.add("user1", "users/user", description="second")
+    last = queue.add("user1", "users/user", description="last")
+    handled = list(objects_from_queue(listener_trigger))
+    assert [obj.entry_uuid for obj in handled] == ["user1", "group1"]
+    user = handled[0]
+    assert user.was_modified()
+    assert user.old_attributes["description"] == "old"
+    assert user.attributes["description"] == "last"
+    assert user.path == last
+    assert user.coalesced_paths == [first, second]
+    assert queue.remaining() == []
+    stored = listener_trigger.old_objects.get("user1")
+    assert stored["object"]["description"] == "last"
+
+
+def test_created_and_deleted_object_is_dropped(listener_trigger, queue):
+    queue.add("user1", "users/user")
+    queue.add("user2", "users/user")
+    queue.add("user1", "users/user", deleted=True)
+    handled = [obj.entry_uuid for obj in objects_from_queue(listener_trigger)]
+    assert handled == ["user2"]
+    assert queue.remaining() == []
+    assert listener_trigger.old_objects.get("user1") is None
+
+
+def test_deleted_and_recreated_object_is_modified(listener_trigger, queue):
+    listener_trigger.old_objects.put(
+        object_content("user1", "users/user", description="old")
+    )
+    queue.add("user1", "users/user", deleted=True)
+    queue.add("user1", "users/user", description="new")
+    handled = list(objects_from_queue(listener_trigger))
+    assert len(handled) == 1
+    assert handled[0].was_modified()
+    assert handled[0].old_attributes["description"] == "old"
+    assert listener_trigger.old_objects.get("user1")["object"]["description"] == "new"
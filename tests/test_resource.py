@@ -1,4 +1,7 @@
 from univention.ox.soap.backend_base import get_ox_integration_class
+from univention.ox.provisioning.storage import OldObjectStore
+
+old_objects = OldObjectStore()  # state of each object after last processing
 
 
 def create_obj(udm, name, domainname, context_id, user):
@@ -29,6 +32,17 @@ def find_obj(context_id, name, assert_empty=False):
         return obj
 
 
+def get_db_id(dn):
+    """
+    Returns the stored ID of the resource in OX (if any)
+    """
+    obj = old_objects.get_by_dn(dn)
+    old_objects.close()
+    if obj is None:
+        return None
+    return obj["object"].get("oxDbId")
+
+
 def test_add_resource_in_default_context(
     default_ox_context,
     new_resource_name,
@@ -156,3 +170,42 @@ def test_change_context_resource(
     obj = find_obj(new_context_id2, new_resource_name)
     assert obj.display_name == "New Object in new Context"
     assert obj.description == "Soon in a new context"
+
+
+def test_resource_recreated_in_ox(
+    default_ox_context,
+    new_resource_name,
+    create_ox_user,
+    udm,
+    domainname,
+    new_user_name,
+    wait_for_listener,
+):
+    """
+    The connector stores the ID of the resource in OX. If the resource is
+    recreated in OX with another ID, the next change finds it by its name
+    and stores the new ID
+    """
+    user = create_ox_user(new_user_name)
+    dn = create_obj(udm, new_resource_name, domainname, None, user)
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_resource_name)
+    assert get_db_id(dn) == obj.id
+    print("Recreating", obj.id, "directly in OX")
+    obj.remove()
+    Resource = get_ox_integration_class("SOAP", "Resource")
+    new_obj = Resource(
+        context_id=default_ox_context,
+        name=obj.name,
+        display_name=obj.display_name,
+        description=obj.description,
+        email=obj.email,
+    )
+    new_obj.create()
+    assert new_obj.id != obj.id
+    udm.modify("oxresources/oxresources", dn, {"description": "Recreated in OX"})
+    wait_for_listener(dn)
+    obj = find_obj(default_ox_context, new_resource_name)
+    assert obj.id == new_obj.id
+    assert obj.description == "Recreated in OX"
+    assert get_db_id(dn) == new_obj.id
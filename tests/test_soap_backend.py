@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+from univention.ox.soap.backend_base import get_ox_integration_class
+
+
+class FakeService(object):
+    """Records the objects sent to OX instead of sending them"""
+
+    def __init__(self):
+        self.changed = []
+
+    def Type(self, **kwargs):
+        return SimpleNamespace(**kwargs)
+
+    def change(self, obj):
+        self.changed.append(vars(obj))
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    service = FakeService()
+    Group = get_ox_integration_class("SOAP", "Group")
+    monkeypatch.setattr(Group, "service", classmethod(lambda cls, context_id: service))
+    return service
+
+
+def test_modify_only_sends_changes(fake_service):
+    """
+    After reset_changes() modify() only sends the changed attributes
+    """
+    Group = get_ox_integration_class("SOAP", "Group")
+    group = Group(id=2, context_id=10, name="group", display_name="Group", members=[1])
+    group.reset_changes()
+    group.display_name = "New Group"
+    group.modify()
+    assert fake_service.changed == [
+        {"id": 2, "name": "group", "displayname": "New Group"}
+    ]
+
+
+def test_modify_sends_list_changed_in_place(fake_service):
+    """
+    A list changed in place after an earlier modify() is still sent
+    """
+    Group = get_ox_integration_class("SOAP", "Group")
+    group = Group(id=2, context_id=10, name="group", display_name="Group", members=[1])
+    group.modify()
+    group.members.append(3)
+    group.modify()
+    assert fake_service.changed[-1] == {"id": 2, "name": "group", "members": [1, 3]}
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+
+from univention.ox.provisioning.helpers import UserIndexEntry
+from univention.ox.provisioning.storage import SCHEMA_VERSION, OldObjectStore
+
+
+def user_content(entry_uuid, ox_context=10, ox_db_id=None, is_ox_user="OK"):
+    attributes = {
+        "username": entry_uuid,
+        "oxContext": ox_context,
+        "isOxUser": is_ox_user,
+    }
+    if ox_db_id is not None:
+        attributes["oxDbId"] = ox_db_id
+    return {
+        "id": entry_uuid,
+        "udm_object_type": "users/user",
+        "dn": "uid={},cn=users,dc=example,dc=com".format(entry_uuid),
+        "object": attributes,
+        "options": {"default": True},
+    }
+
+
+def test_import_export_round_trip(tmp_path):
+    contents = [
+        user_content("user1", ox_db_id=3),
+        user_content("user2", is_ox_user="Not"),
+        {
+            "id": "group1",
+            "udm_object_type": "groups/group",
+            "dn": "cn=group1,cn=groups,dc=example,dc=com",
+            "object": {"name": "group1", "oxDbIds": {"10": 5}},
+            "options": {},
+        },
+    ]
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    for content in contents:
+        (old_dir / "{}.json".format(content["id"])).write_text(json.dumps(content))
+
+    store = OldObjectStore(tmp_path / "old.sqlite")
+    try:
+        assert store.import_directory(old_dir) == len(contents)
+        assert store.get("group1") == contents[2]
+        assert store.user_index(["uid=user1,cn=users,dc=example,dc=com"]) == {
+            "uid=user1,cn=users,dc=example,dc=com": UserIndexEntry(10, 3, True)
+        }
+        assert store.export_directory(tmp_path / "exported") == len(contents)
+    finally:
+        store.close()
+
+    exported = sorted((tmp_path / "exported").glob("*.json"))
+    assert [path.name for path in exported] == [
+        "group1.json",
+        "user1.json",
+        "user2.json",
+    ]
+    for path in exported:
+        original = old_dir / path.name
+        assert json.loads(path.read_text()) == json.loads(original.read_text())
+
+
+def test_user_index_of_old_database_is_filled(tmp_path):
+    db_fname = tmp_path / "old.sqlite"
+    user1 = user_content("user1", ox_db_id=3)
+    user2 = user_content("user2", ox_context=11, is_ox_user="Not")
+    # a database written before user_index existed
+    conn = sqlite3.connect(str(db_fname))
+    conn.execute(
+        "CREATE TABLE objects (entry_uuid TEXT PRIMARY KEY, dn TEXT NOT NULL, "
+        "object_type TEXT NOT NULL, ox_context TEXT, content TEXT NOT NULL)"
+    )
+    for content in [user1, user2]:
+        conn.execute(
+            "INSERT INTO objects VALUES (?, ?, ?, ?, ?)",
+            (
+                content["id"],
+                content["dn"],
+                content["udm_object_type"],
+                str(content["object"]["oxContext"]),
+                json.dumps(content),
+            ),
+        )
+    conn.commit()
+    conn.close()
+
+    store = OldObjectStore(db_fname)
+    try:
+        assert store.user_index([user1["dn"], user2["dn"], "uid=unknown"]) == {
+            user1["dn"]: UserIndexEntry(10, 3, True),
+            user2["dn"]: UserIndexEntry(11, None, False),
+        }
+        (version,) = store.conn.execute("PRAGMA user_version").fetchone()
+        assert version == SCHEMA_VERSION
+    finally:
+        store.close()
@@ -6,6 +6,7 @@ import uuid
 import pytest
 
 from univention.ox.soap.backend_base import User, get_ox_integration_class
+from univention.ox.provisioning.users import str2isodate
 
 T = typing.TypeVar("T")
 
@@ -51,6 +52,29 @@ def delete_obj(context_id, name) -> None:
     find_obj(context_id, name, assert_empty=True)
 
 
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("2020-01-02", "2020-01-02"),
+        ("2020-1-2", "2020-01-02"),
+        ("02.01.2020", "2020-01-02"),
+        ("20200102", None),
+        ("2020-W01-1", None),
+        ("2020-13-01", None),
+    ],
+)
+def test_str2isodate(text, expected):
+    """
+    Dates are sent to OX as YYYY-MM-DD. Only YYYY-MM-DD and DD.MM.YYYY
+    are understood
+    """
+    if expected is None:
+        with pytest.raises(ValueError):
+            str2isodate(text)
+    else:
+        assert str2isodate(text) == expected
+
+
 def test_ignore_user(
     default_ox_context, new_user_name, udm, domainname, wait_for_listener
 ):
@@ -135,6 +159,24 @@ def test_modify_user(
     assert obj.sur_name == "Newman"
 
 
+def test_modify_user_several_times(
+    create_ox_context, new_user_name, udm, domainname, wait_for_listener
+):
+    """
+    Several changes of a UDM object in a row (possibly handled as one
+    change) should leave OX with the last state
+    """
+    new_context_id = create_ox_context()
+    dn = create_obj(udm, new_user_name, domainname, new_context_id)
+    udm.modify("users/user", dn, {"lastname": "Newman"})
+    udm.modify("users/user", dn, {"oxCommercialRegister": "A register"})
+    udm.modify("users/user", dn, {"lastname": "Lastman"})
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    assert obj.commercial_register == "A register"
+    assert obj.sur_name == "Lastman"
+
+
 def no_none():
     return NotImplemented
 
@@ -689,6 +731,45 @@ def test_existing_user_in_different_context(
     assert obj.given_name == "Emil"
 
 
+def test_existing_user_with_different_attributes(
+    create_ox_context, new_user_name, udm, domainname, wait_for_listener
+):
+    """
+    User already exists in OX DB with different attributes and a new
+    user with the same name is created in UDM in the same context. All
+    attributes of the UDM user have to end up in OX, not only the ones
+    that differ from what the connector knew before
+    """
+    User = get_ox_integration_class("SOAP", "User")
+    new_context_id = create_ox_context(wait=True)
+    mail_address = "{}@{}".format(new_user_name, domainname)
+    legacy_user = User(
+        context_id=new_context_id,
+        name=new_user_name,
+        display_name=new_user_name,
+        given_name="Leon",
+        password="dummy",
+        sur_name="Legacy",
+        primary_email=mail_address,
+        email1=mail_address,
+        commercial_register="A legacy register",
+    )
+    legacy_user.create()
+    dn = create_obj(
+        udm,
+        new_user_name,
+        domainname,
+        new_context_id,
+        attrs={"oxCommercialRegister": "A register"},
+    )
+    wait_for_listener(dn)
+    obj = find_obj(new_context_id, new_user_name)
+    assert obj.id == legacy_user.id
+    assert obj.given_name == "Emil"
+    assert obj.sur_name == new_user_name.title()
+    assert obj.commercial_register == "A register"
+
+
 def test_alias(
     create_ox_context, new_user_name, udm, domainname, wait_for_listener
 ):
@@ -44,7 +44,7 @@ from univention.ox.provisioning.contexts import (
     modify_context,
 )
 from univention.ox.provisioning.groups import create_group, delete_group, modify_group
-from univention.ox.provisioning.helpers import Skip, get_context_id
+from univention.ox.provisioning.helpers import Skip
 from univention.ox.provisioning.resources import (
     create_resource,
     delete_resource,
@@ -100,6 +100,8 @@ def run(obj):  # noqa: C901
             f"Could not find admin password for context {exc.args[0]}. Ignoring this task"
         )
     if obj.object_type == "groups/group":
+        group_ids = {}  # context -> ID of the group in OX
+        member_ids = {}  # context -> IDs of the members sent to OX
         for new_obj in get_group_objs(obj):
             try:
                 if new_obj.was_added():
@@ -114,6 +116,14 @@ def run(obj):  # noqa: C901
                 logger.warning(
                     f"Could not find admin password for context {exc.args[0]}. Ignoring this task"
                 )
+            if new_obj.attributes and new_obj.attributes.get("oxDbId"):
+                context_id = str(new_obj.attributes["oxContext"])
+                group_ids[context_id] = new_obj.attributes["oxDbId"]
+                if new_obj.attributes.get("oxMemberIds") is not None:
+                    member_ids[context_id] = new_obj.attributes["oxMemberIds"]
+        if obj.attributes is not None and group_ids:
+            obj.set_attr("oxDbIds", group_ids)
+            obj.set_attr("oxMemberIds", member_ids)
     if obj.object_type == "oxmail/functional_account":
         for new_obj in get_account_objs(obj):
             try:
@@ -152,16 +162,17 @@ def get_group_objs(obj):  # noqa: C901
     if ignored_group:
         return
     contexts = {}
-    for user in set(users):
-        user_obj = univention.ox.provisioning.helpers.get_old_obj(user)
-        if user_obj is None:
+    users = set(users)
+    user_index = univention.ox.provisioning.helpers.get_user_index(users)
+    for user in users:
+        user_entry = user_index.get(user)
+        if user_entry is None:
             logger.info(
                 f"Group wants {user} as member. But the user is unknown. Ignoring..."
             )
             continue
-        try:
-            context = get_context_id(user_obj.attributes)
-        except Skip:
+        context = user_entry.context_id
+        if context is None:
             continue
         users_in_context = contexts.get(context, [])
         users_in_context.append(user)
@@ -189,16 +200,17 @@ def get_account_objs(obj):  # noqa: C901
         users.extend(obj.attributes.get("users"))
         groups.extend(obj.attributes.get("groups"))
     contexts = {}
-    for user in set(users):
-        user_obj = univention.ox.provisioning.helpers.get_old_obj(user)
-        if user_obj is None:
+    users = set(users)
+    user_index = univention.ox.provisioning.helpers.get_user_index(users)
+    for user in users:
+        user_entry = user_index.get(user)
+        if user_entry is None:
             logger.info(
                 f"Account wants {user} as user. But the user is unknown. Ignoring..."
             )
             continue
-        try:
-            context = get_context_id(user_obj.attributes)
-        except Skip:
+        context = user_entry.context_id
+        if context is None:
             continue
         users_in_context, groups_in_context = contexts.get(context, ([], []))
         users_in_context.append(user)
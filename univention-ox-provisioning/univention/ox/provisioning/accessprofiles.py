@@ -33,6 +33,7 @@ import re
 from collections import OrderedDict
 from copy import deepcopy
 from pathlib import Path
+from types import MappingProxyType
 
 logger = logging.getLogger("listener")
 
@@ -109,28 +110,72 @@ capability_map = {
 }
 
 
-_profiles = OrderedDict()
+_profiles = OrderedDict()  # name -> list of rights, as in the file
+_compiled_rights = {}  # name -> read-only {right: bool}, see get_access_rights()
+_NOT_LOADED = object()
+_loaded_version = _NOT_LOADED  # (mtime, size) of the file when it was read
+
+# the rights of a user without access profile
+NO_ACCESS_RIGHTS = MappingProxyType(empty_rights_profile())
+
+
+def _file_version():
+    try:
+        stat = access_definitions_file.stat()
+    except EnvironmentError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_access_profiles(force_reload):
+    """(Re)reads the file if it changed since the last time (another process
+    may have written it) or if forced to"""
+    global _loaded_version
+    version = _file_version()
+    if version == _loaded_version and not force_reload:
+        return
+    _profiles.clear()
+    _compiled_rights.clear()
+    regex = re.compile(r"^(\w+)=(.+)")
+    try:
+        with open(access_definitions_file) as fd:
+            for line in fd:
+                if match := regex.match(line):
+                    name = match.groups()[0].strip()
+                    capabilities = {x.strip() for x in match.groups()[1].split(",")}
+                    _profiles[name] = [
+                        capability_map.get(cap, cap) for cap in capabilities
+                    ]
+    except EnvironmentError:
+        logger.warning(
+            "Could not read %s. Working with empty set...", access_definitions_file
+        )
+    for name, rights in _profiles.items():
+        access_rights = empty_rights_profile()
+        for access_right in rights:
+            if access_right in access_rights:
+                access_rights[access_right] = True
+        _compiled_rights[name] = MappingProxyType(access_rights)
+    _loaded_version = version
 
 
 def get_access_profiles(force_reload):
-    if not _profiles or force_reload:
-        _profiles.clear()
-        regex = re.compile(r"^(\w+)=(.+)")
-        try:
-            with open(access_definitions_file) as fd:
-                for line in fd:
-                    if match := regex.match(line):
-                        name = match.groups()[0].strip()
-                        capabilities = {x.strip() for x in match.groups()[1].split(",")}
-                        _profiles[name] = [
-                            capability_map.get(cap, cap) for cap in capabilities
-                        ]
-        except EnvironmentError:
-            logger.warning(
-                "Could not read %s. Working with empty set...", access_definitions_file
-            )
+    _load_access_profiles(force_reload)
     return deepcopy(_profiles)
 
 
 def get_access_profile(profile_name):
-    return get_access_profiles(force_reload=False).get(profile_name)
+    _load_access_profiles(force_reload=False)
+    profile = _profiles.get(profile_name)
+    if profile is not None:
+        return list(profile)
+
+
+def get_access_rights(profile_name):
+    """
+    All rights (as in empty_rights_profile()) with those of the profile
+    enabled. None if the profile does not exist. The returned mapping is
+    shared and read-only.
+    """
+    _load_access_profiles(force_reload=False)
+    return _compiled_rights.get(profile_name)
@@ -32,7 +32,7 @@ import logging
 from copy import deepcopy
 
 from univention.ox.soap.backend_base import get_ox_integration_class
-from univention.ox.provisioning.helpers import get_obj_by_name_from_ox
+from univention.ox.provisioning.helpers import get_obj_by_name_from_ox, ox_ids
 
 Context = get_ox_integration_class("SOAP", "Context")
 logger = logging.getLogger("listener")
@@ -91,4 +91,5 @@ def delete_context(obj):
         return
     context = context_from_attributes(obj.old_attributes)
     context.remove()
+    ox_ids.forget_context(context.id)
     obj.attributes = None  # make obj.was_deleted() return True
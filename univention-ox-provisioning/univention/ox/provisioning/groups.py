@@ -31,9 +31,11 @@
 import logging
 from copy import deepcopy
 
+from zeep.exceptions import Fault
+
+import univention.ox.provisioning.helpers
 from univention.ox.soap.backend_base import get_ox_integration_class
-from univention.ox.provisioning.helpers import get_context_id, get_db_id, get_obj_by_name_from_ox
-from univention.ox.provisioning.users import get_user_id
+from univention.ox.provisioning.helpers import get_ox_id_by_name, ox_ids
 
 Group = get_ox_integration_class("SOAP", "Group")
 logger = logging.getLogger("listener")
@@ -57,19 +59,52 @@ def update_group(group, attributes):
         return
     members = []
     logger.info("Retrieving members...")
-    for user in attributes.get("users"):
-        username = user[4:].split(",")[0]  # TODO: make this more elegant
-        user_attributes = {}
-        user_attributes["oxContext"] = get_context_id(attributes)
-        user_attributes["oxDbId"] = get_db_id(user)
-        user_attributes["username"] = username
-        user_id = get_user_id(user_attributes, lookup_ox=False)
-        if user_id:
-            logger.info(f"... found {user_id}")
-            members.append(user_id)
+    users = attributes.get("users")
+    user_index = univention.ox.provisioning.helpers.get_user_index(users)
+    for user in users:
+        user_entry = user_index.get(user)
+        if user_entry and user_entry.db_id:
+            logger.info(f"... found {user_entry.db_id}")
+            members.append(user_entry.db_id)
     group.members = members
 
 
+def get_stored_group_id(obj):
+    """The ID of the group in its context as stored after the last change
+    (see oxDbIds in run()), if any"""
+    if obj.old_attributes is None:
+        return None
+    context_id = obj.old_attributes["oxContext"]
+    return (obj.old_attributes.get("oxDbIds") or {}).get(str(context_id))
+
+
+def get_stored_group_members(obj):
+    """The IDs of the members of the group in its context as sent to OX
+    the last time (see oxMemberIds in run()), if known"""
+    if obj.old_attributes is None:
+        return None
+    context_id = obj.old_attributes["oxContext"]
+    return (obj.old_attributes.get("oxMemberIds") or {}).get(str(context_id))
+
+
+def forget_stored_group_id(obj):
+    """Drops the stored ID (and the one in ox_ids), so that get_group_id()
+    looks up the group by name in OX. Returns whether there was a stored
+    ID"""
+    attributes = obj.old_attributes or obj.attributes
+    ox_ids.forget(Group, attributes["oxContext"], attributes.get("name"))
+    if not get_stored_group_id(obj):
+        return False
+    context_id = obj.old_attributes["oxContext"]
+    logger.warning(
+        f"Group was not found by its ID in context {context_id}. Looking it up by name..."
+    )
+    del obj.old_attributes["oxDbIds"][str(context_id)]
+    # the members belonged to the group with that ID
+    (obj.old_attributes.get("oxMemberIds") or {}).pop(str(context_id), None)
+    return True
+
+
 def get_group_id(obj):
     if obj.old_attributes is not None:
         # before delete
@@ -83,9 +118,10 @@ def get_group_id(obj):
     if groupname.lower() == "users":
         logger.info(f'Ignoring group "{groupname}"')
         return None
-    group = get_obj_by_name_from_ox(Group, context_id, groupname)
-    if group:
-        return group.id
+    group_id = get_stored_group_id(obj)
+    if group_id:
+        return group_id
+    return get_ox_id_by_name(Group, context_id, groupname)
 
 
 def create_group(obj):
@@ -109,6 +145,9 @@ def create_group(obj):
     if group.name == "users":
         return
     group.create()
+    ox_ids.set(Group, group.context_id, group.name, group.id)
+    obj.set_attr("oxDbId", group.id)
+    obj.set_attr("oxMemberIds", sorted(group.members))
 
 
 def modify_group(obj):
@@ -120,12 +159,19 @@ def modify_group(obj):
     if not group_id:
         logger.info(f"{obj} does not yet exist. Creating instead...")
         return create_group(obj)
+    old_members = None
     if obj.old_attributes:
         if obj.old_attributes.get("isOxGroup", "Not") == "Not":
             logger.info(
                 f"{obj} was no OX group before... that should not be the case. Modifying anyway..."
             )
         group = group_from_attributes(obj.old_attributes, group_id)
+        was_ox_group = obj.old_attributes.get("isOxGroup", "Not") != "Not"
+        if was_ox_group and group.name == obj.attributes.get("name"):
+            # only the members may have changed. compare them with the
+            # ones sent the last time, not with the old users: the IDs of
+            # those may have changed since then
+            old_members = get_stored_group_members(obj)
         update_group(group, obj.attributes)
     else:
         logger.info(f"{obj} has no old data. Resync?")
@@ -133,7 +179,43 @@ def modify_group(obj):
     if not group.members:
         logger.info(f"{obj} is empty. Deleting instead...")
         return delete_group(obj)
-    group.modify()
+    try:
+        if old_members is None:
+            group.modify()
+        else:
+            modify_group_members(group, old_members)
+    except Fault:
+        if not forget_stored_group_id(obj):
+            raise
+        return modify_group(obj)
+    if obj.old_attributes and obj.old_attributes.get("name") != group.name:
+        ox_ids.set(Group, group.context_id, obj.old_attributes.get("name"), None)
+    ox_ids.set(Group, group.context_id, group.name, group.id)
+    obj.set_attr("oxDbId", group.id)
+    obj.set_attr("oxMemberIds", sorted(group.members))
+
+
+def modify_group_members(group, old_members):
+    """
+    Only sends the users that joined or left the group (the group itself
+    is unchanged). Sets all members if that fails, e.g. because OX did not
+    know about one of the removed users anymore.
+    """
+    to_add = sorted(set(group.members) - set(old_members))
+    to_remove = sorted(set(old_members) - set(group.members))
+    if not to_add and not to_remove:
+        logger.info("Members did not change. Nothing to do...")
+        return
+    try:
+        if to_add:
+            group.add_members(to_add)
+        if to_remove:
+            group.remove_members(to_remove)
+    except Fault as exc:
+        logger.warning(
+            f"Changing the members failed: {exc}. Setting all members instead..."
+        )
+        group.modify()
 
 
 def delete_group(obj):
@@ -143,5 +225,11 @@ def delete_group(obj):
         logger.info(f"{obj} does not exist. Doing nothing...")
         return
     group = group_from_attributes(obj.old_attributes, group_id)
-    group.remove()
+    try:
+        group.remove()
+    except Fault:
+        if not forget_stored_group_id(obj):
+            raise
+        return delete_group(obj)
+    ox_ids.set(Group, group.context_id, group.name, None)
     obj.attributes = None  # make obj.was_deleted() return True
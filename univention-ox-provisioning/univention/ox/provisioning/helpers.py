@@ -27,8 +27,13 @@
 # /usr/share/common-licenses/AGPL-3; if not, see
 # <http://www.gnu.org/licenses/>.
 
+import logging
+from collections import namedtuple
+
 from zeep.exceptions import Fault
 
+logger = logging.getLogger("listener")
+
 
 class Skip(Exception):
     """Raise anywhere if you want to skip the processing of this object"""
@@ -51,6 +56,97 @@ def get_obj_by_name_from_ox(klass, context_id, name):
         raise
 
 
+class OxIdCache(object):
+    """
+    IDs of users, groups and resources in OX by context and name. Saves
+    the lookups by name (getData) that nearly every operation starts with.
+    None means that the object does not exist in OX.
+
+    Whatever the connector creates, renames or deletes itself has to be
+    updated here (set()). Changes made by others in OX are not noticed, so
+    the cache is meant to be cleared regularly (clear(), e.g. after each
+    window of the queue), and an ID that OX does not know anymore has to
+    be dropped (forget()).
+
+    If the type of an object is in warm_types, all objects of that type in
+    a context are listed with the first lookup. Names that are not in the
+    list are then known not to exist without asking OX again.
+    """
+
+    MISSING = object()
+    warm_types = set()  # object types, e.g. "Group"
+
+    def __init__(self):
+        self._ids = {}  # (object type, context id) -> {name: id}
+        self._complete = set()  # (object type, context id) that were listed
+
+    @staticmethod
+    def _key(klass, context_id):
+        return klass._object_type, str(context_id)
+
+    def get(self, klass, context_id, name):
+        """Returns the ID, None if the object does not exist or MISSING if
+        it is unknown"""
+        key = self._key(klass, context_id)
+        if klass._object_type in self.warm_types and key not in self._complete:
+            self.warm(klass, context_id)
+        ids = self._ids.get(key, {})
+        if name in ids:
+            return ids[name]
+        if key in self._complete:
+            return None
+        return self.MISSING
+
+    def set(self, klass, context_id, name, obj_id):
+        if name is None:
+            return
+        self._ids.setdefault(self._key(klass, context_id), {})[name] = obj_id
+
+    def warm(self, klass, context_id):
+        key = self._key(klass, context_id)
+        logger.info(f"Listing all {klass._object_type} objects in context {context_id}")
+        try:
+            objs = klass.list(context_id)
+        except Fault as exc:
+            logger.warning(f"Could not list them: {exc}")
+            objs = []
+        else:
+            self._complete.add(key)
+        ids = self._ids.setdefault(key, {})
+        for obj in objs:
+            ids[obj.name] = obj.id
+
+    def forget(self, klass, context_id, name):
+        """Drops the ID of name, so that it is looked up in OX again"""
+        key = self._key(klass, context_id)
+        self._ids.get(key, {}).pop(name, None)
+        self._complete.discard(key)
+
+    def forget_context(self, context_id):
+        context_id = str(context_id)
+        for key in [key for key in self._ids if key[1] == context_id]:
+            del self._ids[key]
+        self._complete = {key for key in self._complete if key[1] != context_id}
+
+    def clear(self):
+        self._ids.clear()
+        self._complete.clear()
+
+
+ox_ids = OxIdCache()
+
+
+def get_ox_id_by_name(klass, context_id, name):
+    """ID of an object in OX (None if it does not exist). Looked up in
+    ox_ids first"""
+    obj_id = ox_ids.get(klass, context_id, name)
+    if obj_id is OxIdCache.MISSING:
+        obj = get_obj_by_name_from_ox(klass, context_id, name)
+        obj_id = obj.id if obj else None
+        ox_ids.set(klass, context_id, name, obj_id)
+    return obj_id
+
+
 def get_context_id(attributes):
     context_id = attributes.get("oxContext")
     if context_id is None:
@@ -66,3 +162,26 @@ def get_db_id(dn):
     obj = get_old_obj(dn)
     if obj:
         return obj.attributes.get("oxDbId")
+
+
+# what groups and functional accounts need to know about their users
+UserIndexEntry = namedtuple("UserIndexEntry", ["context_id", "db_id", "is_ox_user"])
+
+
+def get_user_index(dns):
+    """
+    Returns {dn: UserIndexEntry} for all users in dns that are known (have
+    an old object). May be overwritten by a faster implementation, e.g. one
+    that does not need to load every single user.
+    """
+    index = {}
+    for dn in dns:
+        obj = get_old_obj(dn)
+        if obj is None or obj.attributes is None:
+            continue
+        index[dn] = UserIndexEntry(
+            obj.attributes.get("oxContext"),
+            obj.attributes.get("oxDbId"),
+            obj.attributes.get("isOxUser", "Not") != "Not",
+        )
+    return index
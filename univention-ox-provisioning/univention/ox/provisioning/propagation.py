@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import groupby, islice
+
+from univention.ox.provisioning.users import User, get_user_rights
+from univention.ox.soap.config import NoContextAdminPassword
+
+logger = logging.getLogger("listener")
+
+# attempts to write to the store while the listener holds its lock
+STORE_ATTEMPTS = 5
+
+
+def find_outdated_users(store, profile_names=None):
+    """
+    Yields (entry_uuid, attributes, access_rights, applied_rights) of all OX
+    users (with one of profile_names, if given) whose access rights as set
+    the last time (oxAccessRights) differ from the current definition of
+    their access profile. This includes users without oxAccessRights: Their
+    rights are unknown, e.g. because they were set before the connector
+    stored them.
+    """
+    for content in store.find("users/user"):
+        attributes = content["object"]
+        if not attributes or attributes.get("isOxUser", "Not") == "Not":
+            continue
+        if not attributes.get("oxDbId") or attributes.get("oxContext") is None:
+            continue
+        if profile_names and attributes.get("oxAccess") not in profile_names:
+            continue
+        access_rights = get_user_rights(attributes)
+        if access_rights is None:
+            continue
+        applied_rights = sorted(
+            right for right, enabled in access_rights.items() if enabled
+        )
+        if attributes.get("oxAccessRights") == applied_rights:
+            continue
+        yield content["id"], attributes, access_rights, applied_rights
+
+
+class AccessRightsPropagation(object):
+    """
+    Sets the access rights of all users whose access profile changed since
+    their rights were set the last time. Users are handled context by
+    context, in batches of concurrent SOAP calls.
+
+    Every user that got its new rights is updated in the store right away,
+    so that the propagation can be interrupted and started again: It then
+    continues with the users that still have outdated rights. The same
+    applies to users that failed.
+
+    Users whose rights are unknown (no oxAccessRights) are skipped unless
+    include_unknown is set: Right after an update of the connector, this
+    would be every user.
+    """
+
+    def __init__(self, store, workers=4, batch_size=100, include_unknown=False):
+        self.store = store
+        self.workers = workers
+        self.batch_size = batch_size
+        self.include_unknown = include_unknown
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.unknown = 0
+
+    def run(self, profile_names=None):
+        users = []
+        for user in find_outdated_users(self.store, profile_names):
+            if not self.include_unknown and user[1].get("oxAccessRights") is None:
+                self.unknown += 1
+                continue
+            users.append(user)
+        users.sort(key=lambda user: str(user[1]["oxContext"]))
+        self.total = len(users)
+        if self.unknown:
+            logger.info(
+                f"Skipping {self.unknown} users whose access rights are unknown"
+            )
+        logger.info(f"{self.total} users need new access rights")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for context_id, context_users in groupby(
+                users, key=lambda user: str(user[1]["oxContext"])
+            ):
+                self._run_context(executor, context_id, list(context_users))
+        logger.info(f"Set the access rights of {self.done} users, {self.failed} failed")
+        return self.failed == 0
+
+    def _run_context(self, executor, context_id, users):
+        logger.info(
+            f"Setting the access rights of {len(users)} users in context {context_id}"
+        )
+        service = User.service(users[0][1]["oxContext"])
+        # the first call also loads the credentials of the context,
+        # before the service is used concurrently
+        try:
+            self._handle_result(
+                users[0], executor.submit(self._set_rights, service, users[0])
+            )
+        except NoContextAdminPassword:
+            logger.warning(
+                f"No admin password for context {context_id}. Skipping its users..."
+            )
+            self.failed += len(users)
+            return
+        users = iter(users[1:])
+        while True:
+            batch = list(islice(users, self.batch_size))
+            if not batch:
+                break
+            futures = {
+                executor.submit(self._set_rights, service, user): user for user in batch
+            }
+            for future in as_completed(futures):
+                self._handle_result(futures[future], future)
+            logger.info(
+                f"{self.done + self.failed}/{self.total} users handled ({self.failed} failed)"
+            )
+
+    @staticmethod
+    def _set_rights(service, user):
+        entry_uuid, attributes, access_rights, applied_rights = user
+        service.change_by_module_access(
+            {"id": attributes["oxDbId"]}, dict(access_rights)
+        )
+
+    def _handle_result(self, user, future):
+        entry_uuid, attributes, access_rights, applied_rights = user
+        try:
+            future.result()
+        except NoContextAdminPassword:
+            raise
+        except Exception as exc:
+            # e.g. a Fault, a timeout or a lost connection: the other
+            # users go on
+            logger.warning(f"Could not set the access rights of {entry_uuid}: {exc}")
+            self.failed += 1
+            return
+        try:
+            # drop the fingerprint: It was made with the old definition of
+            # the access profile. The next change of the user sends
+            # everything again (see modify_user)
+            stored = self._update_attributes(
+                entry_uuid,
+                {
+                    "oxDbId": attributes["oxDbId"],
+                    "oxAccess": attributes.get("oxAccess"),
+                },
+                {"oxAccessRights": applied_rights, "oxFingerprint": None},
+            )
+            if not stored:
+                # the user got another profile while we set the old one.
+                # make the next change of the user (or a run with
+                # include_unknown) set the rights again
+                logger.warning(
+                    f"{entry_uuid} changed in the meantime. "
+                    "Its access rights are unknown now"
+                )
+                self._update_attributes(
+                    entry_uuid, {}, {"oxAccessRights": None, "oxFingerprint": None}
+                )
+        except sqlite3.OperationalError as exc:
+            # the rights are set in OX, but they are not stored
+            logger.warning(f"Could not store the access rights of {entry_uuid}: {exc}")
+            self.failed += 1
+            return
+        self.done += 1
+
+    def _update_attributes(self, entry_uuid, expected, changes):
+        """store.update_attributes(), tried again if the database is locked
+        (e.g. by the listener)"""
+        for attempt in range(1, STORE_ATTEMPTS + 1):
+            try:
+                return self.store.update_attributes(entry_uuid, expected, changes)
+            except sqlite3.OperationalError as exc:
+                if attempt == STORE_ATTEMPTS:
+                    raise
+                logger.warning(f"{exc}. Trying again in {attempt} sec...")
+                time.sleep(attempt)
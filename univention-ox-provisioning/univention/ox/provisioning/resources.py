@@ -31,8 +31,10 @@
 import logging
 from copy import deepcopy
 
+from zeep.exceptions import Fault
+
 from univention.ox.soap.backend_base import get_ox_integration_class
-from univention.ox.provisioning.helpers import get_context_id, get_obj_by_name_from_ox
+from univention.ox.provisioning.helpers import get_context_id, get_ox_id_by_name, ox_ids
 
 Resource = get_ox_integration_class("SOAP", "Resource")
 logger = logging.getLogger("listener")
@@ -53,11 +55,24 @@ def update_resource(resource, attributes):
 
 
 def get_resource_id(attributes):
+    if attributes.get("oxDbId"):
+        return attributes["oxDbId"]
     context_id = get_context_id(attributes)
     name = attributes.get("name")
-    resource = get_obj_by_name_from_ox(Resource, context_id, name)
-    if resource:
-        return resource.id
+    return get_ox_id_by_name(Resource, context_id, name)
+
+
+def forget_stored_resource_id(obj):
+    """Drops the ID stored in the old attributes (and the one in ox_ids),
+    so that get_resource_id() looks up the resource by name in OX. Returns
+    whether there was a stored ID"""
+    attributes = obj.old_attributes or obj.attributes
+    ox_ids.forget(Resource, get_context_id(attributes), attributes.get("name"))
+    if not obj.old_attributes or not obj.old_attributes.get("oxDbId"):
+        return False
+    logger.warning("Resource was not found by its ID. Looking it up by name...")
+    del obj.old_attributes["oxDbId"]
+    return True
 
 
 def create_resource(obj):
@@ -72,6 +87,8 @@ def create_resource(obj):
         return modify_resource(obj)
     resource = resource_from_attributes(obj.attributes)
     resource.create()
+    ox_ids.set(Resource, resource.context_id, resource.name, resource.id)
+    obj.set_attr("oxDbId", resource.id)
 
 
 def modify_resource(obj):
@@ -91,16 +108,26 @@ def modify_resource(obj):
                     f"{obj} was found in context {old_context} with ID {resource_id} and in {new_context} with {already_existing_resource_id}. This should not happen. Will delete in {old_context} and modify in {new_context}"  # noqa
                 )
                 delete_resource(deepcopy(obj))
+                resource_id = already_existing_resource_id
             else:
                 create_resource(obj)
                 return delete_resource(deepcopy(obj))
         resource = resource_from_attributes(obj.old_attributes, resource_id)
         resource.context_id = new_context
         update_resource(resource, obj.attributes)
+        if resource.name != obj.old_attributes.get("name"):
+            ox_ids.set(Resource, old_context, obj.old_attributes.get("name"), None)
     else:
         logger.info(f"{obj} has no old data. Resync?")
         resource = resource_from_attributes(obj.attributes, resource_id)
-    resource.modify()
+    try:
+        resource.modify()
+    except Fault:
+        if not forget_stored_resource_id(obj):
+            raise
+        return modify_resource(obj)
+    ox_ids.set(Resource, resource.context_id, resource.name, resource.id)
+    obj.set_attr("oxDbId", resource.id)
 
 
 def delete_resource(obj):
@@ -110,5 +137,11 @@ def delete_resource(obj):
         logger.info(f"{obj} does not exist. Doing nothing...")
         return
     resource = resource_from_attributes(obj.old_attributes, resource_id)
-    resource.remove()
+    try:
+        resource.remove()
+    except Fault:
+        if not forget_stored_resource_id(obj):
+            raise
+        return delete_resource(obj)
+    ox_ids.set(Resource, resource.context_id, resource.name, None)
     obj.attributes = None  # make obj.was_deleted() return True
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+import json
+import logging
+import os
+import sqlite3
+from itertools import islice
+from pathlib import Path
+
+from univention.ox.provisioning.helpers import UserIndexEntry
+
+logger = logging.getLogger("listener")
+
+DEFAULT_DB = Path(
+    "/var/lib/univention-appcenter/apps/ox-connector/data/listener/old.sqlite"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    entry_uuid TEXT PRIMARY KEY,
+    dn TEXT NOT NULL,
+    object_type TEXT NOT NULL,
+    ox_context TEXT,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_dn ON objects (dn);
+CREATE INDEX IF NOT EXISTS objects_type_context ON objects (object_type, ox_context);
+CREATE TABLE IF NOT EXISTS user_index (
+    entry_uuid TEXT PRIMARY KEY,
+    dn TEXT NOT NULL,
+    ox_context,
+    ox_db_id,
+    is_ox_user INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_index_dn ON user_index (dn);
+"""
+SCHEMA_VERSION = 1
+
+# max. number of parameters in one query (SQLITE_MAX_VARIABLE_NUMBER is
+# 999 in older versions of SQLite)
+QUERY_CHUNK_SIZE = 500
+
+
+class OldObjectStore(object):
+    """
+    Holds the state of every object as it was last processed successfully
+    (the "old" object). One SQLite database (in WAL mode, so that readers
+    do not block the listener), keyed by entry_uuid and indexed by dn,
+    object type and oxContext. The stored content is the same dict as in
+    the JSON files of the listener: id, udm_object_type, dn, object, options.
+
+    For users, a compact index (dn -> oxContext, oxDbId, isOxUser) is kept
+    in a second table so that groups can look up their members without
+    loading each user (see user_index()).
+
+    The connection is opened on first access and kept open until close().
+    Every change is committed right away: A write transaction kept open
+    while the listener talks to OX would block other writers (e.g.
+    propagate-access-profiles) for that long.
+    """
+
+    def __init__(self, db_fname=DEFAULT_DB, timeout=5.0):
+        self.db_fname = str(db_fname)
+        self.timeout = timeout  # seconds to wait for other writers
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_fname, timeout=self.timeout)
+            os.chmod(self.db_fname, 0o600)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version < SCHEMA_VERSION:
+                self._upgrade_schema(version)
+        return self._conn
+
+    def _upgrade_schema(self, version):
+        if version < 1:
+            # databases created before user_index existed
+            for (content,) in self._conn.execute(
+                "SELECT content FROM objects WHERE object_type = 'users/user'"
+            ).fetchall():
+                self._index_user(json.loads(content))
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def _fetch_one(self, query, *args):
+        row = self.conn.execute(query, args).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def get(self, entry_uuid):
+        return self._fetch_one(
+            "SELECT content FROM objects WHERE entry_uuid = ?", entry_uuid
+        )
+
+    def get_by_dn(self, dn):
+        # should there (temporarily) be more than one object with this dn,
+        # the most recently stored one wins
+        return self._fetch_one(
+            "SELECT content FROM objects WHERE dn = ? ORDER BY rowid DESC LIMIT 1", dn
+        )
+
+    def find(self, object_type, ox_context=None):
+        """Yields all objects of a type (in a context, if given)"""
+        if ox_context is None:
+            cursor = self.conn.execute(
+                "SELECT content FROM objects WHERE object_type = ?", (object_type,)
+            )
+        else:
+            cursor = self.conn.execute(
+                "SELECT content FROM objects WHERE object_type = ? AND ox_context = ?",
+                (object_type, str(ox_context)),
+            )
+        for (content,) in cursor:
+            yield json.loads(content)
+
+    def user_index(self, dns):
+        """
+        Returns {dn: UserIndexEntry} for all users in dns. Unknown dns are
+        left out.
+        """
+        dns = iter(dns)
+        index = {}
+        while True:
+            chunk = list(islice(dns, QUERY_CHUNK_SIZE))
+            if not chunk:
+                break
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                "SELECT dn, ox_context, ox_db_id, is_ox_user FROM user_index "
+                f"WHERE dn IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            )
+            for dn, ox_context, ox_db_id, is_ox_user in cursor:
+                index[dn] = UserIndexEntry(ox_context, ox_db_id, bool(is_ox_user))
+        return index
+
+    def _index_user(self, content):
+        attributes = content["object"] or {}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO user_index (entry_uuid, dn, ox_context, ox_db_id, is_ox_user) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                content["id"],
+                content["dn"],
+                attributes.get("oxContext"),
+                attributes.get("oxDbId"),
+                attributes.get("isOxUser", "Not") != "Not",
+            ),
+        )
+
+    def put(self, content):
+        with self.conn:
+            self._put(content)
+
+    def _put(self, content):
+        ox_context = (content["object"] or {}).get("oxContext")
+        if ox_context is not None:
+            ox_context = str(ox_context)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO objects (entry_uuid, dn, object_type, ox_context, content) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                content["id"],
+                content["dn"],
+                content["udm_object_type"],
+                ox_context,
+                json.dumps(content, sort_keys=True, separators=(",", ":")),
+            ),
+        )
+        if content["udm_object_type"] == "users/user":
+            self._index_user(content)
+
+    def update_attributes(self, entry_uuid, expected, changes):
+        """
+        Changes some attributes of a stored object, based on its current
+        state in the database (other processes may have changed it in the
+        meantime). Only if the attributes in expected still have these
+        values. A value of None in changes removes the attribute. Commits
+        immediately. Returns whether the object was changed.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            content = self.get(entry_uuid)
+            attributes = (content or {}).get("object")
+            if not attributes or any(
+                attributes.get(k) != v for k, v in expected.items()
+            ):
+                return False
+            for key, value in changes.items():
+                if value is None:
+                    attributes.pop(key, None)
+                else:
+                    attributes[key] = value
+            self._put(content)
+            return True
+        finally:
+            self.conn.commit()
+
+    def delete(self, entry_uuid):
+        with self.conn:
+            self.conn.execute("DELETE FROM objects WHERE entry_uuid = ?", (entry_uuid,))
+            self.conn.execute(
+                "DELETE FROM user_index WHERE entry_uuid = ?", (entry_uuid,)
+            )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def import_directory(self, directory):
+        """Stores every JSON file (<entry_uuid>.json) in directory. Returns
+        the number of imported objects"""
+        num = 0
+        # no OX calls in between: commit in batches of 1000 objects
+        with self.conn:
+            for path in Path(directory).glob("*.json"):
+                with path.open() as fd:
+                    self._put(json.load(fd))
+                num += 1
+                if num % 1000 == 0:
+                    self.conn.commit()
+                    logger.info(f"Imported {num} objects")
+        return num
+
+    def export_directory(self, directory):
+        """Writes every object into directory as <entry_uuid>.json, the
+        layout used before this store existed. Returns the number of
+        exported objects"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        num = 0
+        for (content,) in self.conn.execute("SELECT content FROM objects"):
+            content = json.loads(content)
+            path = directory / "{}.json".format(content["id"])
+            with open(path, "w") as fd:
+                os.fchmod(fd.fileno(), 0o600)
+                json.dump(content, fd, sort_keys=True, indent=4)
+            num += 1
+        return num
@@ -29,6 +29,7 @@
 
 
 import datetime
+import hashlib
 import logging
 from copy import deepcopy
 from urllib.parse import urlparse
@@ -38,10 +39,16 @@ import base64
 import univention.ox.provisioning.helpers
 from univention.ox.soap.backend_base import get_ox_integration_class
 from univention.ox.provisioning.accessprofiles import (
-    empty_rights_profile,
-    get_access_profile,
+    NO_ACCESS_RIGHTS,
+    get_access_rights,
+)
+from univention.ox.provisioning.helpers import (
+    OxIdCache,
+    Skip,
+    get_context_id,
+    get_obj_by_name_from_ox,
+    ox_ids,
 )
-from univention.ox.provisioning.helpers import Skip, get_context_id, get_obj_by_name_from_ox
 from univention.ox.soap.config import (
     DEFAULT_IMAP_SERVER,
     DEFAULT_LANGUAGE,
@@ -56,6 +63,18 @@ logger = logging.getLogger("listener")
 
 
 def str2isodate(text):  # type: (str) -> str
+    if (
+        isinstance(text, str)
+        and len(text) == 10
+        and text[4] == text[7] == "-"
+        and text.isascii()
+    ):
+        # fast path for the format UDM uses. only for exactly YYYY-MM-DD:
+        # fromisoformat() accepts more formats than strptime() below
+        try:
+            return "{:%Y-%m-%d}".format(datetime.date.fromisoformat(text))
+        except ValueError:
+            pass
     exc1 = exc2 = None
     try:
         the_date = datetime.datetime.strptime(text, "%Y-%m-%d")
@@ -83,210 +102,215 @@ def user_from_attributes(attributes, user_id=None):
     return user
 
 
+# Attributes of the OX user -> (UDM property, default). The OX specific
+# properties and their OX fields are defined in share/attrlist.csv
+USER_ATTRIBUTES = {
+    "name": ("username", None),
+    "display_name": ("oxDisplayName", None),
+    "given_name": ("firstname", None),
+    "sur_name": ("lastname", None),
+    "default_sender_address": ("mailPrimaryAddress", None),  # TODO: ???
+    "branches": ("oxBranches", None),
+    "cellular_telephone1": ("oxMobileBusiness", None),
+    "city_business": ("city", None),
+    "city_home": ("oxCityHome", None),
+    "city_other": ("oxCityOther", None),
+    "commercial_register": ("oxCommercialRegister", None),
+    "company": ("organisation", None),
+    "country_business": ("oxCountryBusiness", None),
+    "country_home": ("oxCountryHome", None),
+    "country_other": ("oxCountryOther", None),
+    "department": ("oxDepartment", None),
+    "email1": ("mailPrimaryAddress", None),
+    "primary_email": ("mailPrimaryAddress", None),
+    "imap_login": ("mailPrimaryAddress", None),
+    "email2": ("oxEmail2", None),
+    "email3": ("oxEmail3", None),
+    "employee_type": ("employeeType", None),
+    "fax_business": ("oxFaxBusiness", None),
+    "fax_home": ("oxFaxHome", None),
+    "fax_other": ("oxFaxOther", None),
+    "instant_messenger1": ("oxInstantMessenger1", None),
+    "instant_messenger2": ("oxInstantMessenger2", None),
+    "language": ("oxLanguage", DEFAULT_LANGUAGE),
+    "manager_name": ("oxManagerName", None),
+    "marital_status": ("oxMarialStatus", None),
+    "middle_name": ("oxMiddleName", None),
+    "nickname": ("oxNickName", None),
+    "note": ("oxNote", None),
+    "number_of_children": ("oxNumOfChildren", None),
+    "number_of_employee": ("employeeNumber", None),
+    "position": ("oxPosition", None),
+    "postal_code_business": ("postcode", None),
+    "postal_code_home": ("oxPostalCodeHome", None),
+    "postal_code_other": ("oxPostalCodeOther", None),
+    "profession": ("oxProfession", None),
+    "sales_volume": ("oxSalesVolume", None),
+    "spouse_name": ("oxSpouseName", None),
+    "state_business": ("oxStateBusiness", None),
+    "state_home": ("oxStateHome", None),
+    "state_other": ("oxStateOther", None),
+    "street_business": ("street", None),
+    "street_home": ("oxStreetHome", None),
+    "street_other": ("oxStreetOther", None),
+    "suffix": ("oxSuffix", None),
+    "tax_id": ("oxTaxId", None),
+    "telephone_assistant": ("oxTelephoneAssistant", None),
+    "telephone_car": ("oxTelephoneCar", None),
+    "telephone_company": ("oxTelephoneCompany", None),
+    "telephone_ip": ("oxTelephoneIp", None),
+    "telephone_other": ("oxTelephoneOther", None),
+    "telephone_telex": ("oxTelephoneTelex", None),
+    "telephone_ttytdd": ("oxTelephoneTtydd", None),
+    "timezone": ("oxTimeZone", LOCAL_TIMEZONE),
+    "title": ("title", None),
+    "url": ("oxUrl", None),
+    "used_quota": ("oxUserQuota", None),  # TODO: or max_quota?
+    "max_quota": ("oxUserQuota", None),  # TODO: or used_quota?
+    **{f"userfield{num:02d}": (f"oxUserfield{num:02d}", None) for num in range(1, 21)},
+}
+
+# Attributes of the OX user -> (multi-valued UDM property, index)
+USER_LIST_ATTRIBUTES = {
+    "room_number": ("roomNumber", 0),
+    "cellular_telephone2": ("mobileTelephoneNumber", 0),
+    "telephone_pager": ("pagerTelephoneNumber", 0),
+    "telephone_business1": ("phone", 0),
+    "telephone_business2": ("phone", 1),
+    "telephone_home1": ("homeTelephoneNumber", 0),
+    "telephone_home2": ("homeTelephoneNumber", 1),
+}
+
+# Attributes of the OX user -> UDM property holding a date
+USER_DATE_ATTRIBUTES = {
+    "anniversary": "oxAnniversary",
+    "birthday": "birthday",
+}
+
+# Attributes of the OX user that are the same for all users
+USER_CONSTANT_ATTRIBUTES = {
+    "context_admin": False,
+    "password": "dummy",
+    "gui_spam_filter_enabled": True,
+}
+
+# the tables as tuples, to be iterated quickly in update_user()
+_user_attributes = tuple(
+    (name, prop, default) for name, (prop, default) in USER_ATTRIBUTES.items()
+)
+_user_list_attributes = tuple(
+    (name, prop, index) for name, (prop, index) in USER_LIST_ATTRIBUTES.items()
+)
+_user_date_attributes = tuple(USER_DATE_ATTRIBUTES.items())
+_user_constant_attributes = tuple(USER_CONSTANT_ATTRIBUTES.items())
+
+# the servers are the same for all users (unless mailHomeServer is set)
+_imap_url = urlparse(DEFAULT_IMAP_SERVER)
+_smtp_url = urlparse(DEFAULT_SMTP_SERVER)
+IMAP_SERVER_PARTS = (_imap_url.hostname, _imap_url.port, _imap_url.scheme + "://")
+SMTP_SERVER_PARTS = (_smtp_url.hostname, _smtp_url.port, _smtp_url.scheme + "://")
+
+
 def update_user(user, attributes):
-    user.context_admin = False
-    user.name = attributes.get("username")
-    user.display_name = attributes.get("oxDisplayName")
-    user.password = "dummy"
-    user.given_name = attributes.get("firstname")
-    user.sur_name = attributes.get("lastname")
-    user.default_sender_address = attributes.get("mailPrimaryAddress")  # TODO: ???
-    # user.assistant_name = attributes.get()
-    user.branches = attributes.get("oxBranches")
-    # user.business_category = attributes.get()
-    # user.categories = attributes.get()
-    user.cellular_telephone1 = attributes.get("oxMobileBusiness")
-    user.city_business = attributes.get("city")
-    user.city_home = attributes.get("oxCityHome")
-    user.city_other = attributes.get("oxCityOther")
-    user.commercial_register = attributes.get("oxCommercialRegister")
-    user.company = attributes.get("organisation")
-    user.country_business = attributes.get("oxCountryBusiness")
-    user.country_home = attributes.get("oxCountryHome")
-    user.country_other = attributes.get("oxCountryOther")
-    # user.drive_user_folder_mode = attributes.get()
-    # user.default_group = attributes.get()
-    user.department = attributes.get("oxDepartment")
-    user.email1 = attributes.get("mailPrimaryAddress")
-    user.primary_email = user.email1
-    user.imap_login = user.email1
-    user.email2 = attributes.get("oxEmail2")
-    user.email3 = attributes.get("oxEmail3")
-    user.employee_type = attributes.get("employeeType")
-    user.fax_business = attributes.get("oxFaxBusiness")
-    user.fax_home = attributes.get("oxFaxHome")
-    user.fax_other = attributes.get("oxFaxOther")
-    # user.filestore_id = attributes.get()
-    # user.filestore_name = attributes.get()
-    # user.folder_tree = attributes.get()
-    # user.gui_preferences_for_soap = attributes.get()
-    user.gui_spam_filter_enabled = True
-    # user.info = attributes.get()
-    user.instant_messenger1 = attributes.get("oxInstantMessenger1")
-    user.instant_messenger2 = attributes.get("oxInstantMessenger2")
-    user.language = attributes.get("oxLanguage", DEFAULT_LANGUAGE)
-    # user.mail_folder_confirmed_ham_name = attributes.get()
-    # user.mail_folder_confirmed_spam_name = attributes.get()
-    # user.mail_folder_drafts_name = attributes.get()
-    # user.mail_folder_sent_name = attributes.get()
-    # user.mail_folder_spam_name = attributes.get()
-    # user.mail_folder_trash_name = attributes.get()
-    # user.mail_folder_archive_full_name = attributes.get()
-    user.manager_name = attributes.get("oxManagerName")
-    user.marital_status = attributes.get("oxMarialStatus")
-    user.middle_name = attributes.get("oxMiddleName")
-    user.nickname = attributes.get("oxNickName")
-    user.note = attributes.get("oxNote")
-    user.number_of_children = attributes.get("oxNumOfChildren")
-    user.number_of_employee = attributes.get("employeeNumber")
-    # user.password_mech = attributes.get()
-    # user.password_expired = attributes.get()
-    user.position = attributes.get("oxPosition")
-    user.postal_code_business = attributes.get("postcode")
-    user.postal_code_home = attributes.get("oxPostalCodeHome")
-    user.postal_code_other = attributes.get("oxPostalCodeOther")
-    user.profession = attributes.get("oxProfession")
-    user.sales_volume = attributes.get("oxSalesVolume")
-    user.spouse_name = attributes.get("oxSpouseName")
-    user.state_business = attributes.get("oxStateBusiness")
-    user.state_home = attributes.get("oxStateHome")
-    user.state_other = attributes.get("oxStateOther")
-    user.street_business = attributes.get("street")
-    user.street_home = attributes.get("oxStreetHome")
-    user.street_other = attributes.get("oxStreetOther")
-    user.suffix = attributes.get("oxSuffix")
-    user.tax_id = attributes.get("oxTaxId")
-    user.telephone_assistant = attributes.get("oxTelephoneAssistant")
-    # user.telephone_callback = attributes.get()
-    user.telephone_car = attributes.get("oxTelephoneCar")
-    user.telephone_company = attributes.get("oxTelephoneCompany")
-    user.telephone_ip = attributes.get("oxTelephoneIp")
-    # user.telephone_isdn = attributes.get()
-    user.telephone_other = attributes.get("oxTelephoneOther")
-    # user.telephone_primary = attributes.get()
-    # user.telephone_radio = attributes.get()
-    user.telephone_telex = attributes.get("oxTelephoneTelex")
-    user.telephone_ttytdd = attributes.get("oxTelephoneTtydd")
-    user.timezone = attributes.get("oxTimeZone", LOCAL_TIMEZONE)
-    user.title = attributes.get("title")
-    # user.upload_file_size_limit = attributes.get()
-    # user.upload_file_size_limitPerFile = attributes.get()
-    user.url = attributes.get("oxUrl")
-    user.used_quota = attributes.get("oxUserQuota")  # TODO: or max_quota?
-    user.max_quota = attributes.get("oxUserQuota")  # TODO: or used_quota?
-    # user.user_attributes = attributes.get()
-    user.userfield01 = attributes.get("oxUserfield01")
-    user.userfield02 = attributes.get("oxUserfield02")
-    user.userfield03 = attributes.get("oxUserfield03")
-    user.userfield04 = attributes.get("oxUserfield04")
-    user.userfield05 = attributes.get("oxUserfield05")
-    user.userfield06 = attributes.get("oxUserfield06")
-    user.userfield07 = attributes.get("oxUserfield07")
-    user.userfield08 = attributes.get("oxUserfield08")
-    user.userfield09 = attributes.get("oxUserfield09")
-    user.userfield10 = attributes.get("oxUserfield10")
-    user.userfield11 = attributes.get("oxUserfield11")
-    user.userfield12 = attributes.get("oxUserfield12")
-    user.userfield13 = attributes.get("oxUserfield13")
-    user.userfield14 = attributes.get("oxUserfield14")
-    user.userfield15 = attributes.get("oxUserfield15")
-    user.userfield16 = attributes.get("oxUserfield16")
-    user.userfield17 = attributes.get("oxUserfield17")
-    user.userfield18 = attributes.get("oxUserfield18")
-    user.userfield19 = attributes.get("oxUserfield19")
-    user.userfield20 = attributes.get("oxUserfield20")
-    if attributes.get("jpegPhoto"):
-        byte_image = base64.b64decode(attributes.get("jpegPhoto").encode('utf8'))
-        content_type = imghdr.what(None, h=byte_image)
-        if content_type == 'jpeg':
-            content_type = 'image/jpeg'
-        else:
-            logger.warn(f"We only support jpeg images. Found {content_type!r}. Ignoring image...")
-            content_type = None
-        if content_type:
-            user.image1 = byte_image
-            user.image1ContentType = content_type
-    else:
+    get = attributes.get
+    for name, value in _user_constant_attributes:
+        setattr(user, name, value)
+    for name, prop, default in _user_attributes:
+        setattr(user, name, get(prop, default))
+    for name, prop, index in _user_list_attributes:
+        values = get(prop)
+        setattr(user, name, values[index] if values and len(values) > index else None)
+    for name, prop in _user_date_attributes:
+        value = get(prop)
+        setattr(user, name, str2isodate(value) if value else None)
+    update_user_image(user, get("jpegPhoto"))
+    user.aliases = [user.email1] + get("mailAlternativeAddress", [])
+    user.mail_enabled = get("oxAccess", "none") != "none"
+    hostname, user.imap_port, user.imap_schema = IMAP_SERVER_PARTS
+    user.imap_server = get("mailHomeServer", hostname)
+    hostname, user.smtp_port, user.smtp_schema = SMTP_SERVER_PARTS
+    user.smtp_server = get("mailHomeServer", hostname)
+
+
+def update_user_image(user, jpeg_photo):
+    if not jpeg_photo:
         user.image1 = b""
         user.image1ContentType = ""
-    # user.primary_account_name = attributes.get()
-    # user.convert_drive_user_folders = attributes.get()
-    if attributes.get("roomNumber"):
-        user.room_number = attributes.get("roomNumber")[0]
-    else:
-        user.room_number = None
-    if attributes.get("mobileTelephoneNumber"):
-        user.cellular_telephone2 = attributes.get("mobileTelephoneNumber")[0]
-    else:
-        user.cellular_telephone2 = None
-    if attributes.get("pagerTelephoneNumber"):
-        user.telephone_pager = attributes.get("pagerTelephoneNumber")[0]
-    else:
-        user.telephone_pager = None
-    if attributes.get("oxAnniversary"):
-        user.anniversary = str2isodate(attributes.get("oxAnniversary"))
-    else:
-        user.anniversary = None
-    if attributes.get("birthday"):
-        user.birthday = str2isodate(attributes.get("birthday"))
-    else:
-        user.birthday = None
-    if len(attributes.get("phone", [])) >= 1:
-        user.telephone_business1 = attributes.get("phone")[0]
-    else:
-        user.telephone_business1 = None
-    if len(attributes.get("phone", [])) >= 2:
-        user.telephone_business2 = attributes.get("phone")[1]
-    else:
-        user.telephone_business2 = None
-    if len(attributes.get("homeTelephoneNumber", [])) >= 1:
-        user.telephone_home1 = attributes.get("homeTelephoneNumber")[0]
-    else:
-        user.telephone_home1 = None
-    if len(attributes.get("homeTelephoneNumber", [])) >= 2:
-        user.telephone_home2 = attributes.get("homeTelephoneNumber")[1]
-    else:
-        user.telephone_home2 = None
-    aliases = [user.email1] + attributes.get("mailAlternativeAddress", [])
-    user.aliases = aliases
-    if attributes.get("oxAccess", "none") != "none":
-        user.mail_enabled = True
-    else:
-        user.mail_enabled = False
+        return
+    byte_image = base64.b64decode(jpeg_photo.encode("utf8"))
+    content_type = imghdr.what(None, h=byte_image)
+    if content_type != "jpeg":
+        logger.warn(
+            f"We only support jpeg images. Found {content_type!r}. Ignoring image..."
+        )
+        return
+    user.image1 = byte_image
+    user.image1ContentType = "image/jpeg"
 
-    imap_url = urlparse(DEFAULT_IMAP_SERVER)
-    user.imap_port = imap_url.port  # 143
-    user.imap_schema = imap_url.scheme + "://"  # "imap://"
-    user.imap_server = attributes.get("mailHomeServer", imap_url.hostname)
-    # user.imap_server_string = attributes.get()
-    smtp_url = urlparse(DEFAULT_SMTP_SERVER)
-    user.smtp_port = smtp_url.port  # 587
-    user.smtp_schema = smtp_url.scheme + "://"  # "smtp://"
-    user.smtp_server = attributes.get("mailHomeServer", smtp_url.hostname)
-    # user.smtp_server_string = attributes.get()
 
+def get_user_rights(attributes):
+    """The access rights of the user according to its access profile
+    (read-only). None if the profile does not exist"""
+    user_access = attributes.get("oxAccess")
+    if not user_access:
+        return NO_ACCESS_RIGHTS
+    return get_access_rights(user_access)
 
-def set_user_rights(user, obj):
-    access_rights = empty_rights_profile()
 
+def set_user_rights(user, obj, new_user=True):
+    """
+    Sets the access rights of the user in OX. The rights are stored as
+    oxAccessRights; unless it is a new_user (or one whose state in OX is
+    unknown), they are only set if they differ from the ones set the last
+    time.
+    """
     user_access = obj.attributes.get("oxAccess")
-
-    if user_access:
-        access_profile = get_access_profile(user_access)
-        if access_profile is None:
-            logger.warning(
-                f"Cannot find access profile {user_access!r}. Leaving access rights untouched!"
-            )
-            return
-    else:
-        access_profile = []
-    for access_right in access_profile:
-        if access_right in access_rights:
-            access_rights[access_right] = True
-    logger.info(f"Changing user {user.id} to profile {user_access}")
-    user.service(user.context_id).change_by_module_access(
-        {"id": user.id}, access_rights
+    access_rights = get_user_rights(obj.attributes)
+    if access_rights is None:
+        logger.warning(
+            f"Cannot find access profile {user_access!r}. Leaving access rights untouched!"
+        )
+        return
+    applied_rights = sorted(
+        right for right, enabled in access_rights.items() if enabled
     )
+    if (
+        not new_user
+        and obj.old_attributes
+        and obj.old_attributes.get("oxDbId") == user.id
+        and obj.old_attributes.get("oxAccessRights") == applied_rights
+    ):
+        logger.info(f"Access rights of user {user.id} did not change")
+    else:
+        logger.info(f"Changing user {user.id} to profile {user_access}")
+        user.service(user.context_id).change_by_module_access(
+            {"id": user.id}, dict(access_rights)
+        )
+    obj.set_attr("oxAccessRights", applied_rights)
+
+
+def get_user_fingerprint(attributes):
+    """
+    Hash over everything the connector sends to OX for a user: all mapped
+    attributes (see update_user), context and name, and the access rights.
+    Stored as oxFingerprint. If it is unchanged, there is nothing to do.
+    """
+    user = user_from_attributes(attributes)
+    rights = get_user_rights(attributes)
+    if rights is not None:
+        rights = sorted(rights.items())
+    return hashlib.sha256(f"{user.fingerprint()}{rights!r}".encode("utf-8")).hexdigest()
+
+
+def is_unchanged_user(obj):
+    """Whether nothing relevant for OX changed since the user was last
+    processed (only if its OX ID is known, too)"""
+    if not obj.old_attributes or not obj.old_attributes.get("oxDbId"):
+        return False
+    fingerprint = obj.old_attributes.get("oxFingerprint")
+    if fingerprint is None:
+        return False
+    return fingerprint == get_user_fingerprint(obj.attributes)
 
 
 def get_user_id(attributes, lookup_ox=True):
@@ -300,12 +324,18 @@ def get_user_id(attributes, lookup_ox=True):
         raise Skip(
             f"Not touching {username} in context {context_id}: Is context admin!"
         )
+    user_id = ox_ids.get(User, context_id, username)
+    if user_id is not OxIdCache.MISSING:
+        return user_id
     logger.info(f"Searching for {username} in context {context_id}")
-    if not User.service(context_id).exists(User.service(context_id).Type(id=None, name=username)):
-        return
-    user = get_obj_by_name_from_ox(User, context_id, username)
-    if user:
-        return user.id
+    user_id = None
+    service = User.service(context_id)
+    if service.exists(service.Type(id=None, name=username)):
+        user = get_obj_by_name_from_ox(User, context_id, username)
+        if user:
+            user_id = user.id
+    ox_ids.set(User, context_id, username, user_id)
+    return user_id
 
 
 def create_user(obj):
@@ -320,11 +350,14 @@ def create_user(obj):
                 "Found in DB but had no old attributes. Using new ones as old..."
             )
         logger.info(f"{obj} exists. Modifying instead...")
-        return modify_user(obj)
+        # the user in OX may differ from anything the old attributes say
+        return modify_user(obj, full=True)
     user = user_from_attributes(obj.attributes)
     user.create()
+    ox_ids.set(User, user.context_id, user.name, user.id)
     obj.set_attr("oxDbId", user.id)
     set_user_rights(user, obj)
+    obj.set_attr("oxFingerprint", get_user_fingerprint(obj.attributes))
     logger.info("Looking for groups of this user to be created in the context id")
     for group in obj.attributes.get("groups", []):
         group_obj = univention.ox.provisioning.helpers.get_old_obj(group)
@@ -349,6 +382,7 @@ def create_user(obj):
                 members=[user.id],
             )
             group.create()
+            ox_ids.set(Group, group.context_id, group.name, group.id)
         else:
             logger.info(f"Adding {user.id} to the members of {groupname}")
             if user.id not in group.members:
@@ -356,11 +390,27 @@ def create_user(obj):
                 group.modify()
 
 
-def modify_user(obj):
+def modify_user(obj, full=False):
+    """
+    Sends the changes of the user to OX: Only the attributes that differ
+    from the old attributes, unless full is set because the old attributes
+    do not reflect the user in OX or they have no fingerprint (e.g. after
+    ox-old-objects reset-fingerprints). Then all attributes and the access
+    rights are sent.
+    """
     logger.info(f"Modifying {obj}")
+    if obj.old_attributes and not obj.old_attributes.get("oxFingerprint"):
+        full = True
     if obj.attributes.get("isOxUser", "Not") == "Not":
         logger.info(f"{obj} is no OX user. Deleting instead...")
         return delete_user(obj)
+    if not full and is_unchanged_user(obj):
+        logger.info(f"Nothing changed for OX in {obj}. Doing nothing...")
+        obj.set_attr("oxDbId", obj.old_attributes["oxDbId"])
+        obj.set_attr("oxFingerprint", obj.old_attributes["oxFingerprint"])
+        if "oxAccessRights" in obj.old_attributes:
+            obj.set_attr("oxAccessRights", obj.old_attributes["oxAccessRights"])
+        return
     try:
         user_id = get_user_id(obj.old_attributes)
     except Skip:
@@ -388,14 +438,27 @@ def modify_user(obj):
                 create_user(obj)
                 return delete_user(deepcopy(obj))
         user = user_from_attributes(obj.old_attributes, user_id)
+        if old_context == new_context and not full:
+            # only send what changed since the last time
+            user.reset_changes()
         user.context_id = new_context
         update_user(user, obj.attributes)
+        renamed = user.name != obj.old_attributes.get("username")
+        if renamed:
+            ox_ids.set(User, old_context, obj.old_attributes.get("username"), None)
+        changed = full or renamed or bool(user.changed_attributes())
     else:
         logger.info(f"{obj} has no old data. Resync?")
         user = user_from_attributes(obj.attributes, user_id)
-    user.modify()
+        changed = True
+    if changed:
+        user.modify()
+    else:
+        logger.info("No attribute changed. Only setting the access rights...")
+    ox_ids.set(User, user.context_id, user.name, user.id)
     obj.set_attr("oxDbId", user.id)
-    set_user_rights(user, obj)
+    set_user_rights(user, obj, new_user=full)
+    obj.set_attr("oxFingerprint", get_user_fingerprint(obj.attributes))
 
 
 def delete_user(obj):
@@ -411,6 +474,7 @@ def delete_user(obj):
     group_service = Group.service(user.context_id)
     soap_groups = group_service.list_groups_for_user({"id": user.id})
     user.remove()
+    ox_ids.set(User, user.context_id, user.name, None)
     obj.attributes = None  # make obj.was_deleted() return True
     logger.info("User was deleted, searching for now empty groups")
     for soap_group in soap_groups:
@@ -421,3 +485,4 @@ def delete_user(obj):
         if not soap_group.members:
             logger.info(f"Thus, deleting group {soap_group.id} in {user.context_id}...")
             group_service.delete(soap_group)
+            ox_ids.set(Group, user.context_id, soap_group.name, None)
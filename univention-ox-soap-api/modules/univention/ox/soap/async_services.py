@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+# Asynchronous services of OX' SOAP API
+#
+# Copyright 2023 Univention GmbH
+#
+# http://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <http://www.gnu.org/licenses/>.
+
+#
+# The services of services.py for asyncio: their methods return awaitables
+# of the SOAP calls. Python 3 only.
+#
+# Example (in one event loop):
+#
+#   service = get_ox_soap_async_service_class('User')(ClientCredentials(context_id=10))
+#   users = await asyncio.gather(*[service.get_data(service.Type(name=name)) for name in names])
+#   await close_async_transport()
+#
+
+from __future__ import absolute_import
+import logging
+import os
+import ssl
+try:
+	from typing import Dict, Optional, Tuple, Type
+except ImportError:
+	pass
+
+import aiohttp
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from zeep import AsyncClient
+from zeep.transports import Transport
+from zeep.wsdl.utils import etree_to_string
+
+from .config import OX_SOAP_SERVER, SOAP_CONNECT_TIMEOUT, SOAP_KEEP_ALIVE, SOAP_POOL_SIZE, SOAP_READ_TIMEOUT
+from .services import OXContextService, OXGroupService, OXResourceService, OXSecondaryAccountService, OXUserService, OxSoapService, WS_URLS, get_client
+
+
+__all__ = ['get_ox_soap_async_service_class', 'close_async_transport']
+__async_zeep_clients = dict()  # type: Dict[Tuple[str, str], AsyncClient]
+__async_transport = None  # type: Optional[AiohttpTransport]
+logger = logging.getLogger(__name__)
+
+
+class AiohttpTransport(Transport):
+	"""
+	Transport sending the SOAP calls with aiohttp. The WSDL is loaded by the
+	synchronous client (see get_async_client()).
+
+	zeep's own AsyncTransport uses httpx, whose connection pool needs more
+	and more CPU time with the number of concurrent calls.
+	"""
+
+	def __init__(self, session):  # type: (aiohttp.ClientSession) -> None
+		self.session = session
+		self._close_session = False  # see aclose()
+		self.cache = None
+		self.logger = logger
+
+	async def post_xml(self, address, envelope, headers):  # type: (str, lxml.etree._Element, Dict[str, str]) -> Response
+		async with self.session.post(address, data=etree_to_string(envelope), headers=headers) as aio_response:
+			response = Response()
+			response._content = await aio_response.read()
+			response.status_code = aio_response.status
+			response.headers = CaseInsensitiveDict(aio_response.headers)
+			response.encoding = aio_response.get_encoding()
+		return response
+
+	async def aclose(self):  # type: () -> None
+		await self.session.close()
+
+
+def get_async_transport(pool_size=SOAP_POOL_SIZE, keep_alive=SOAP_KEEP_ALIVE):  # type: (int, bool) -> AiohttpTransport
+	"""
+	Transport for the SOAP calls of the asynchronous services. It opens at
+	most pool_size connections per server, further calls wait for a free
+	one. With keep_alive=False, every call uses a new connection.
+
+	It is bound to the event loop it is created in: call
+	close_async_transport() at the end of the event loop.
+	"""
+	global __async_transport
+	if __async_transport is None:
+		connector = aiohttp.TCPConnector(
+			limit=0,
+			limit_per_host=pool_size,
+			force_close=not keep_alive,
+			ssl=ssl.create_default_context(cafile=os.environ.get('REQUESTS_CA_BUNDLE')),
+		)
+		timeout = aiohttp.ClientTimeout(sock_connect=SOAP_CONNECT_TIMEOUT, sock_read=SOAP_READ_TIMEOUT)
+		__async_transport = AiohttpTransport(aiohttp.ClientSession(connector=connector, timeout=timeout))
+	return __async_transport
+
+
+async def close_async_transport():  # type: () -> None
+	"""Close the connections of get_async_transport()."""
+	global __async_transport
+	if __async_transport is not None:
+		__async_zeep_clients.clear()
+		transport, __async_transport = __async_transport, None
+		await transport.aclose()
+
+
+def get_async_client(server=OX_SOAP_SERVER, object_type='Context'):  # type: (Optional[str], Optional[str]) -> AsyncClient
+	"""
+	Get the asynchronous zeep client of a service. It uses the WSDL and the
+	endpoint of the synchronous client (see get_client()), so the WSDL is
+	still loaded synchronously, once.
+	"""
+	key = (server, object_type)
+	if key not in __async_zeep_clients:
+		client = get_client(server, object_type)
+		async_client = AsyncClient(client.wsdl, transport=get_async_transport())
+		async_client.service._binding_options['address'] = client.service._binding_options['address']
+		__async_zeep_clients[key] = async_client
+	return __async_zeep_clients[key]
+
+
+class AsyncOxSoapService(OxSoapService):
+	"""
+	Base class of the asynchronous service classes. They have the methods of
+	the synchronous service classes, but return awaitables of the results.
+	"""
+
+	def __init__(self, client_credentials):  # type: (univention.ox.soap.client.ClientCredentials) -> None
+		assert self._type_name in WS_URLS, 'Unknown service {!r}.'.format(self._type_name)
+
+		self.credentials = client_credentials
+		self.Type = getattr(client_credentials.types, self._type_name)
+		self.client = get_async_client(self.credentials.server, self._type_name)
+		self._operations = self.client.service._operations  # type: Dict[str, zeep.proxy.AsyncOperationProxy]
+
+
+class AsyncOXContextService(AsyncOxSoapService, OXContextService):
+	pass
+
+
+class AsyncOXGroupService(AsyncOxSoapService, OXGroupService):
+	pass
+
+
+class AsyncOXResourceService(AsyncOxSoapService, OXResourceService):
+	pass
+
+
+class AsyncOXSecondaryAccountService(AsyncOxSoapService, OXSecondaryAccountService):
+	pass
+
+
+class AsyncOXUserService(AsyncOxSoapService, OXUserService):
+	pass
+
+
+__async_service_registry = dict(
+	(kls._type_name, kls)
+	for kls in (
+		AsyncOXContextService, AsyncOXGroupService, AsyncOXResourceService, AsyncOXSecondaryAccountService, AsyncOXUserService
+	)
+)  # type: Dict[str, Type[AsyncOxSoapService]]
+
+
+def get_ox_soap_async_service_class(service_type):  # type: (str) -> Type[AsyncOxSoapService]
+	return __async_service_registry[service_type]
@@ -29,7 +29,9 @@
 # /usr/share/common-licenses/AGPL-3; if not, see
 # <http://www.gnu.org/licenses/>.
 
+import hashlib
 from collections import namedtuple
+from copy import deepcopy
 
 from six import with_metaclass
 
@@ -47,11 +49,14 @@ SoapAttribute = namedtuple('SoapAttribute', ['name', 'default'], defaults=[None]
 
 
 class SoapBackend(object):
+	__slots__ = ()
+	_instance_attributes = ('default_service', '_soap_server', '_soap_username', '_soap_password', '_unchanged')
 	_backend = 'SOAP'
 	_client_credential_objs = {}
 	_service_objs = {}
 	_base2soap = {}
 	_mandatory_creation_attr = ()
+	_unchanged = None  # type: Optional[Dict[str, Any]]
 
 	def __repr__(self):
 		attrs = list(self._base2soap) + ['id', 'name', 'context_id']
@@ -75,12 +80,48 @@ class SoapBackend(object):
 			else:
 				self.logger.warn('Unknown argument {!r}={!r}.'.format(k, v))
 
-	def _base_obj2soap_obj(self):  # type: () -> Any
+	def reset_changes(self):  # type: () -> None
 		"""
-		Creates a Soap Object from the OxObject
+		Remember the current values of the attributes. A following modify()
+		only sends the attributes that were changed after this call, also
+		lists that were changed in place.
+
+		:return: None
+		"""
+		self._unchanged = dict((attr, deepcopy(getattr(self, attr))) for attr in self._base2soap)
+
+	def changed_attributes(self):  # type: () -> List[str]
+		"""
+		Attributes that differ from the values remembered by
+		reset_changes(). All attributes if it was not called.
+
+		:return: list of attribute names
+		"""
+		if self._unchanged is None:
+			return list(self._base2soap)
+		return [attr for attr in self._base2soap if getattr(self, attr) != self._unchanged[attr]]
+
+	def fingerprint(self):  # type: () -> str
+		"""
+		Hash over the values that create() or modify() would send to OX
+		(except the ID). Equal fingerprints mean that OX would not change.
+
+		:return: str - hex digest
+		"""
+		obj = self._base_obj2soap_obj()
+		del obj['id']
+		obj['context_id'] = str(self.context_id)
+		return hashlib.sha256(repr(sorted(obj.items())).encode('utf-8')).hexdigest()
+
+	def _base_obj2soap_obj(self, attrs=None):  # type: (Optional[List[str]]) -> Any
+		"""
+		Creates a Soap Object from the OxObject. Only with the attributes in
+		attrs (and id and name), if given.
 		"""
 		obj = {'id': self.id, 'name': self.name}
 		for base_attr, soap_attr in self._base2soap.items():
+			if attrs is not None and base_attr not in attrs:
+				continue
 			value = getattr(self, base_attr)
 			if value is None:
 				# we would want to set this to zeep.Nil to actually
@@ -175,11 +216,13 @@ class SoapBackend(object):
 		assert self.id is not None
 		assert self.name is not None
 
-		obj_kwargs = self._base_obj2soap_obj()
+		changed = self.changed_attributes()
+		obj_kwargs = self._base_obj2soap_obj(changed)
 		obj = self.service(self.context_id).Type(**obj_kwargs)
 		self.service(self.context_id).change(obj)
-		self.logger.info('Modified {} {!r} in context {} (id={!r}).'.format(
-			self._object_type.lower(), obj.name, self.context_id, self.id))
+		self.reset_changes()
+		self.logger.info('Modified {} {!r} in context {} (id={!r}, {} attributes).'.format(
+			self._object_type.lower(), obj.name, self.context_id, self.id, len(changed)))
 
 	def remove(self):  # type: () -> None
 		"""
@@ -196,10 +239,11 @@ class SoapBackend(object):
 
 	@classmethod
 	def _soap_obj2base_obj(cls, context_id, soap_obj):  # type: (int, Any) -> OxObject
-		kwargs = {'id': int(soap_obj.id), 'name': soap_obj.name, 'context_id': int(context_id)}
+		obj = cls(id=int(soap_obj.id), name=soap_obj.name, context_id=int(context_id))
+		# set directly, instead of passing ~100 arguments through __init__()
 		for k, v in cls._base2soap.items():
-			kwargs[k] = getattr(soap_obj, v.name)
-		return cls(**kwargs)
+			setattr(obj, k, getattr(soap_obj, v.name))
+		return obj
 
 
 class SoapContext(with_metaclass(BackendMetaClass, SoapBackend, Context)):
@@ -310,6 +354,34 @@ class SoapGroup(with_metaclass(BackendMetaClass, SoapBackend, Group)):
 	}
 	_mandatory_creation_attr = ('name',)
 
+	def add_members(self, member_ids):  # type: (List[int]) -> None
+		"""
+		Add users to the group (without sending the other members).
+
+		:param member_ids: list of IDs of the users to add
+		:return: None
+		"""
+		assert self.id is not None
+		grp = self.service(self.context_id).Type(id=self.id)
+		members = [SoapUser.service(self.context_id).Type(id=member_id) for member_id in member_ids]
+		self.service(self.context_id).add_member(grp, members)
+		self.logger.info('Added {!r} to {} {!r} in context {} (id={!r}).'.format(
+			member_ids, self._object_type.lower(), self.name, self.context_id, self.id))
+
+	def remove_members(self, member_ids):  # type: (List[int]) -> None
+		"""
+		Remove users from the group (without sending the other members).
+
+		:param member_ids: list of IDs of the users to remove
+		:return: None
+		"""
+		assert self.id is not None
+		grp = self.service(self.context_id).Type(id=self.id)
+		members = [SoapUser.service(self.context_id).Type(id=member_id) for member_id in member_ids]
+		self.service(self.context_id).remove_member(grp, members)
+		self.logger.info('Removed {!r} from {} {!r} in context {} (id={!r}).'.format(
+			member_ids, self._object_type.lower(), self.name, self.context_id, self.id))
+
 
 class SoapResource(with_metaclass(BackendMetaClass, SoapBackend, Resource)):
 
@@ -31,7 +31,7 @@
 
 import logging
 try:
-	from typing import Dict, List, Optional, Type, Union
+	from typing import Any, Dict, List, Optional, Tuple, Type, Union
 	import datetime
 except ImportError:
 	pass
@@ -71,19 +71,46 @@ class BackendMetaClass(type):
 	"""
 	Meta class for ox integration backend classes. All concrete classes should
 	use this as a metaclass to automatically register themselves.
+
+	The attributes declared in the classes (public ones, and those listed in
+	`_instance_attributes`) are stored in `__slots__` of the concrete class.
+	Their declared values become defaults, returned as long as an attribute
+	was not set (see OxObject.__getattr__).
 	"""
 	logger = logging.getLogger(__name__)
 
 	def __new__(cls, clsname, bases, attrs):
+		if any(issubclass(base, OxObject) for base in bases):
+			cls._add_slots(bases, attrs)
 		kls = super(BackendMetaClass, cls).__new__(cls, clsname, bases, attrs)  # type: Type["OxObject"]
 		if issubclass(kls, OxObject) and getattr(kls, '_backend') and getattr(kls, '_object_type'):
-			if not kls.logger:
-				kls.logger = cls.logger.getChild(clsname)
+			if 'logger' not in attrs:
+				kls.logger = logging.getLogger('{}.{}'.format(__name__, clsname))
 			register_ox_integration_backend_class(kls._backend, kls._object_type, kls)
 			cls.logger.debug('Registered class {!r} of backend {!r} for object type {!r}.'.format(
 				cls.__name__, kls._backend, kls._object_type))
 		return kls
 
+	@staticmethod
+	def _add_slots(bases, attrs):  # type: (Tuple[type], Dict[str, Any]) -> None
+		slotted = set()
+		defaults = {}
+		classes = [attrs] + [vars(klass) for base in bases for klass in base.__mro__]
+		for namespace in reversed(classes):
+			slotted.update(namespace.get('__slots__', ()))
+			names = list(namespace.get('_instance_attributes', ()))
+			names.extend(
+				name for name, value in namespace.items()
+				if not name.startswith('_') and name != 'logger' and not callable(value)
+				and not isinstance(value, (classmethod, staticmethod, property))
+			)
+			for name in names:
+				defaults[name] = namespace.get(name)
+		for name in defaults:
+			attrs.pop(name, None)
+		attrs['__slots__'] = tuple(name for name in defaults if name not in slotted)
+		attrs['_defaults'] = defaults
+
 
 class OxObject(object):
 	"""
@@ -94,18 +121,27 @@ class OxObject(object):
 	Both `id` and `name` are sufficient to identify an OX object in a context.
 	`context_id` must be set (except for Context, where it's the same as `id`).
 	"""
+	__slots__ = ()
 	_backend = None  # type: str
 	_object_type = None  # type: str
+	_defaults = {}  # type: Dict[str, Any]
+	logger = logging.getLogger(__name__)  # type: logging.Logger
 
 	id = None  # type: int
 	name = None  # type: str
 	context_id = None  # type: int
 
 	def __init__(self, *args, **kwargs):  # type: (*str, **str) -> None
-		self.logger = logging.getLogger('{}.{}'.format(__name__, self.__class__.__name__))
 		self.kwargs2attr(**kwargs)
 		self.backend_init(*args, **kwargs)
 
+	def __getattr__(self, name):  # type: (str) -> Any
+		# only called for attributes that were not set yet
+		try:
+			return self._defaults[name]
+		except KeyError:
+			raise AttributeError('{!r} object has no attribute {!r}'.format(self.__class__.__name__, name))
+
 	def backend_init(self, *args, **kwargs):  # type: (*str, **str) -> None
 		pass
 
@@ -140,6 +176,24 @@ class OxObject(object):
 		"""
 		raise NotImplementedError()
 
+	def reset_changes(self):  # type: () -> None
+		"""
+		Remember the current values of the attributes. A following modify()
+		only sends the attributes that were changed after this call.
+
+		:return: None
+		"""
+		raise NotImplementedError()
+
+	def fingerprint(self):  # type: () -> str
+		"""
+		Hash over the values that create() or modify() would send to OX
+		(except the ID). Equal fingerprints mean that OX would not change.
+
+		:return: str - hex digest
+		"""
+		raise NotImplementedError()
+
 	def from_ox(self, context_id, obj_id=None, name=None):
 		# type: (int, Optional[int], Optional[str]) -> "OxObject"
 		"""
@@ -173,6 +227,7 @@ class Context(OxObject):
 	When implementing a class derived from this, use BackendMetaClass as its
 	metaclass.
 	"""
+	__slots__ = ()
 	_object_type = 'Context'
 
 	average_size = None  # type: int
@@ -199,11 +254,30 @@ class Group(OxObject):
 	When implementing a class derived from this, use BackendMetaClass as its
 	metaclass.
 	"""
+	__slots__ = ()
 	_object_type = 'Group'
 
 	display_name = None  # type: str
 	members = []  # type: List[int]
 
+	def add_members(self, member_ids):  # type: (List[int]) -> None
+		"""
+		Add users to the group (without sending the other members).
+
+		:param member_ids: list of IDs of the users to add
+		:return: None
+		"""
+		raise NotImplementedError()
+
+	def remove_members(self, member_ids):  # type: (List[int]) -> None
+		"""
+		Remove users from the group (without sending the other members).
+
+		:param member_ids: list of IDs of the users to remove
+		:return: None
+		"""
+		raise NotImplementedError()
+
 
 class Resource(OxObject):
 	"""
@@ -212,6 +286,7 @@ class Resource(OxObject):
 	When implementing a class derived from this, use BackendMetaClass as its
 	metaclass.
 	"""
+	__slots__ = ()
 	_object_type = 'Resource'
 
 	available = True
@@ -227,6 +302,7 @@ class SecondaryAccount(OxObject):
 	When implementing a class derived from this, use BackendMetaClass as its
 	metaclass.
 	"""
+	__slots__ = ()
 	_object_type = 'SecondaryAccount'
 
 	email = None  # type: str
@@ -244,6 +320,7 @@ class User(OxObject):
 	When implementing a class derived from this, use BackendMetaClass as its
 	metaclass.
 	"""
+	__slots__ = ()
 	_object_type = 'User'
 
 	aliases = []  # type: List[str]
@@ -17,7 +17,14 @@ OX_MASTER_ADMIN = os.environ.get("OX_MASTER_ADMIN", "oxadminmaster")
 OX_MASTER_PASSWORD = os.environ.get("OX_MASTER_PASSWORD", "")
 QUOTA = -1  # unlimited
 OX_SOAP_SERVER = os.environ.get("OX_SOAP_SERVER", "http://127.0.0.1")
+OX_SOAP_ENDPOINT = os.environ.get("OX_SOAP_ENDPOINT")  # taken from the WSDL if not set
 CREDENTIALS_FILE = os.environ.get("OX_CREDENTIALS_FILE", "/etc/ox-secrets/ox-contexts.json")
+WSDL_CACHE_FILE = os.environ.get("OX_WSDL_CACHE_FILE")  # in memory if not set
+WSDL_CACHE_TIMEOUT = int(os.environ.get("OX_WSDL_CACHE_TIMEOUT", 86400))
+SOAP_POOL_SIZE = int(os.environ.get("OX_SOAP_POOL_SIZE") or 10)
+SOAP_KEEP_ALIVE = os.environ.get("OX_SOAP_KEEP_ALIVE", "true").lower() in ("1", "true", "yes")
+SOAP_CONNECT_TIMEOUT = float(os.environ.get("OX_SOAP_CONNECT_TIMEOUT") or 10)
+SOAP_READ_TIMEOUT = float(os.environ.get("OX_SOAP_READ_TIMEOUT") or 300)
 
 _CREDENTIALS = {}
 
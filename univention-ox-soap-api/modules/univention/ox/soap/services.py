@@ -52,16 +52,20 @@
 from __future__ import absolute_import
 import logging
 try:
-	from typing import Any, Optional, Type
+	from typing import Any, Dict, Optional, Tuple, Type
 except ImportError:
 	pass
 
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
 from six import with_metaclass
+from six.moves.urllib.parse import urlsplit, urlunsplit
 from zeep import Client as ZeepClient
-from zeep.cache import InMemoryCache
+from zeep.cache import InMemoryCache, SqliteCache
 from zeep.transports import Transport
 
-from .config import OX_SOAP_SERVER
+from .config import OX_SOAP_ENDPOINT, OX_SOAP_SERVER, SOAP_CONNECT_TIMEOUT, SOAP_KEEP_ALIVE, SOAP_POOL_SIZE, SOAP_READ_TIMEOUT, WSDL_CACHE_FILE, WSDL_CACHE_TIMEOUT
 
 
 __all__ = ['get_ox_soap_service_class']
@@ -74,6 +78,8 @@ WS_URLS = {
 	'User': '{}/OXUserService?wsdl'.format(WS_BASE_URL),
 }
 __ox_service_registry = dict()
+__zeep_clients = dict()  # type: Dict[Tuple[str, str], ZeepClient]
+__transport = None  # type: Optional[Transport]
 logger = logging.getLogger(__name__)
 
 
@@ -85,13 +91,117 @@ def get_ox_soap_service_class(service_type):  # type: (str) -> Type[OxSoapServic
 	return __ox_service_registry[service_type]
 
 
+class WsdlCache(SqliteCache):
+	"""
+	Persistent cache of the WSDL and XSD files of OX. The files are loaded
+	again when they expire, e.g. to get the changes of an OX update.
+	"""
+
+	def get_expired(self, url):  # type: (str) -> Optional[bytes]
+		"""The content of url, even if it expired"""
+		with self.db_connection() as conn:
+			cursor = conn.cursor()
+			cursor.execute('SELECT content FROM request WHERE url=?', (url,))
+			rows = cursor.fetchall()
+		if rows:
+			return self._decode_data(rows[0][0])
+		return None
+
+
+class WsdlTransport(Transport):
+	"""
+	Transport loading the WSDL and XSD files through a WsdlCache. Uses the
+	expired files if they can not be loaded again from OX.
+	"""
+
+	def load(self, url):  # type: (str) -> bytes
+		try:
+			return super(WsdlTransport, self).load(url)
+		except RequestException as exc:
+			content = self.cache.get_expired(url)
+			if content is None:
+				raise
+			logger.warning('Could not load {} ({}). Using the expired copy...'.format(url, exc))
+			return bytes(content)
+
+
+def get_session(pool_size=SOAP_POOL_SIZE, keep_alive=SOAP_KEEP_ALIVE):  # type: (int, bool) -> Session
+	"""
+	HTTP session keeping up to pool_size connections per server open, to be
+	reused by following requests (saving the TCP and TLS handshakes). Use
+	at least as many connections as requests are sent concurrently. With
+	keep_alive=False, every request uses a new connection.
+	"""
+	session = Session()
+	adapter = HTTPAdapter(pool_maxsize=pool_size)
+	session.mount('http://', adapter)
+	session.mount('https://', adapter)
+	if not keep_alive:
+		session.headers['Connection'] = 'close'
+	return session
+
+
+def get_transport():  # type: () -> Transport
+	global __transport
+	if __transport is None:
+		kwargs = {
+			'timeout': (SOAP_CONNECT_TIMEOUT, SOAP_READ_TIMEOUT),
+			'operation_timeout': (SOAP_CONNECT_TIMEOUT, SOAP_READ_TIMEOUT),
+			'session': get_session(),
+		}
+		if WSDL_CACHE_FILE:
+			__transport = WsdlTransport(cache=WsdlCache(WSDL_CACHE_FILE, timeout=WSDL_CACHE_TIMEOUT), **kwargs)
+		else:
+			__transport = Transport(cache=InMemoryCache(), **kwargs)
+	return __transport
+
+
+def get_endpoint(address, endpoint=OX_SOAP_ENDPOINT):  # type: (str, Optional[str]) -> str
+	"""
+	The address to send the SOAP calls to, for the address of a service in
+	its WSDL. The scheme, host and port of endpoint (e.g.
+	"https://ox.example.com:8443") replace the ones of the WSDL, if set.
+	"""
+	if endpoint:
+		return urlunsplit(urlsplit(endpoint)[:2] + urlsplit(address)[2:])
+	# Bug: OX references itself in its WSDL definition always with
+	# port 80. even with https:// !
+	if address.startswith('https://'):
+		return address.replace(':80/', ':443/')
+	return address
+
+
+def create_client(server, object_type, transport=None, **kwargs):  # type: (str, str, Optional[Transport], **Any) -> ZeepClient
+	"""
+	Load the WSDL of a service into a new zeep client, sending the SOAP calls
+	to get_endpoint().
+	"""
+	client = ZeepClient(WS_URLS[object_type].format(server=server), transport=transport or get_transport(), **kwargs)
+	binding_options = client.service._binding_options
+	binding_options['address'] = get_endpoint(binding_options['address'])
+	return client
+
+
+def get_client(server=OX_SOAP_SERVER, object_type='Context'):  # type: (Optional[str], Optional[str]) -> ZeepClient
+	"""
+	Get the zeep client of a service. It is shared by the services of all
+	contexts (they pass the context and credentials with every call), so
+	that the WSDL is loaded and parsed only once per server and service.
+	"""
+	key = (server, object_type)
+	if key not in __zeep_clients:
+		logger.debug('Loading WSDL of service {!r} from {!r}...'.format(object_type, server))
+		__zeep_clients[key] = create_client(server, object_type)
+	return __zeep_clients[key]
+
+
 def get_wsdl(server=OX_SOAP_SERVER, object_type='Context'):  # type: (Optional[str], Optional[str]) -> zeep.wsdl.Document
 	"""
 	Get WSDL from server.
 
 	object_type usually doesn't matter.
 	"""
-	return ZeepClient(WS_URLS[object_type].format(server=server)).wsdl
+	return get_client(server, object_type).wsdl
 
 
 class OxSoapServiceError(Exception):
@@ -106,38 +216,40 @@ class OxServiceMetaClass(type):
 
 	def __new__(cls, clsname, bases, attrs):
 		kls = super(OxServiceMetaClass, cls).__new__(cls, clsname, bases, attrs)  # type: Type[OxSoapService]
-		if issubclass(kls, OxSoapService) and getattr(kls, '_type_name'):
+		if issubclass(kls, OxSoapService) and attrs.get('_type_name'):
 			register_ox_service_class(kls._type_name, kls)
 			logger.debug('Registered class {!r} for service type {!r}.'.format(cls.__name__, kls._type_name))
 		return kls
 
 
-class OxSoapService(ZeepClient):
-	"""Base class of service classes."""
+class OxSoapService(object):
+	"""
+	Base class of service classes. One object per context, all of them use
+	the same zeep client (see get_client()).
+	"""
 
 	_type_name = ''
 	_ctx_arg_name = 'ctx'
 	Type = None
 
-	_transport = None  # type: zeep.transports.Transport
-
 	def __init__(self, client_credentials, **kwargs):
 		# type: (univention.ox.soap.client.ClientCredentials, **str) -> None
 		assert self._type_name in WS_URLS, 'Unknown service {!r}.'.format(self._type_name)
 
 		self.credentials = client_credentials
 		self.Type = getattr(client_credentials.types, self._type_name)
-		transport = kwargs.pop('transport', None)
-		assert transport is None or isinstance(transport, Transport)
-		if not transport:
-			if not self._transport:
-				self.__class__._transport = Transport(cache=InMemoryCache())
-			transport = self._transport
-		super(OxSoapService, self).__init__(
-			WS_URLS[self._type_name].format(server=self.credentials.server),
-			transport=transport,
-			**kwargs
-		)
+		if kwargs:
+			# a client with other settings, not to be shared
+			transport = kwargs.pop('transport', None)
+			assert transport is None or isinstance(transport, Transport)
+			self.client = create_client(self.credentials.server, self._type_name, transport, **kwargs)
+		else:
+			self.client = get_client(self.credentials.server, self._type_name)
+		self._operations = self.client.service._operations  # type: Dict[str, zeep.proxy.OperationProxy]
+
+	@property
+	def service(self):  # type: () -> zeep.proxy.ServiceProxy
+		return self.client.service
 
 	def _call_ox(self, func, **kwargs):  # type: (str, **Any) -> Any
 		assert self.credentials.context_obj is not None
@@ -154,13 +266,19 @@ class OxSoapService(ZeepClient):
 				'service.'
 			)
 		kwargs['auth'] = kwargs.pop('auth', None) or self.credentials.credentials
-		# Bug: OX references itself in its WSDL definition always with
-		# port 80. even with https:// !
-		service = self.service
-		binding_options = service._binding_options
-		if binding_options['address'].startswith('https://'):
-			binding_options['address'] = binding_options['address'].replace(':80/', ':443/')
-		return getattr(service, func)(**kwargs)
+		return self._operations[func](**kwargs)
+
+	def _call_ox_in_context(self, func, **kwargs):  # type: (str, **Any) -> Any
+		"""
+		Shorter _call_ox() for the frequent calls: in the context of the
+		service (unless ctx is passed) with its credentials (unless auth is
+		passed).
+		"""
+		if 'ctx' not in kwargs:
+			kwargs[self._ctx_arg_name] = self.credentials.context_obj
+		if 'auth' not in kwargs:
+			kwargs['auth'] = self.credentials.credentials
+		return self._operations[func](**kwargs)
 
 
 class OXContextService(with_metaclass(OxServiceMetaClass, OxSoapService)):
@@ -186,7 +304,7 @@ class OXContextService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 		* Change storage data informations - Change filestore infos for
 		context. Normally NO need to change!
 		"""
-		return self._call_ox('change', ctx=context_obj, auth=self.credentials.master_credentials)
+		return self._call_ox_in_context('change', ctx=context_obj, auth=self.credentials.master_credentials)
 
 	def change_capabilities(self, context_obj, caps_to_add=None, caps_to_remove=None, caps_to_drop=None):
 		# type: (univention.ox.soap.types.Types.Context, Optional[str], Optional[str], Optional[str]) -> None
@@ -324,7 +442,7 @@ class OXContextService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 
 	def exists(self, context_obj):  # type: (univention.ox.soap.types.Types.Context) -> bool
 		"""Determines whether a context already exists."""
-		return self._call_ox('exists', ctx=context_obj, auth=self.credentials.master_credentials)
+		return self._call_ox_in_context('exists', ctx=context_obj, auth=self.credentials.master_credentials)
 
 	def downgrade(self, context_obj):  # type: (univention.ox.soap.types.Types.Context) -> None
 		"""
@@ -354,7 +472,7 @@ class OXContextService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 	def get_data(self, context_obj):
 		# type: (univention.ox.soap.types.Types.Context) -> univention.ox.soap.types.Types.Context
 		"""Get specified context details"""
-		return self._call_ox('getData', ctx=context_obj, auth=self.credentials.master_credentials)
+		return self._call_ox_in_context('getData', ctx=context_obj, auth=self.credentials.master_credentials)
 
 	def get_module_access(self, context_obj):
 		# type: (univention.ox.soap.types.Types.Context) -> univention.ox.soap.types.Types.UserModuleAccess
@@ -428,7 +546,7 @@ class OXGroupService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 
 	def change(self, grp):  # type: (univention.ox.soap.types.Types.Group) -> None
 		"""Method for changing group data in given context"""
-		return self._call_ox('change', grp=grp)
+		return self._call_ox_in_context('change', grp=grp)
 
 	def create(self, grp):  # type: (univention.ox.soap.types.Types.Group) -> None
 		"""Create new group in given context."""
@@ -449,7 +567,7 @@ class OXGroupService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 	def get_data(self, grp):
 		# type: (univention.ox.soap.types.Types.Group) -> univention.ox.soap.types.Types.Group
 		"""Fetch a group from server."""
-		return self._call_ox('getData', grp=grp)
+		return self._call_ox_in_context('getData', grp=grp)
 
 	def get_members(self, grp):
 		# type: (univention.ox.soap.types.Types.Group) -> List[univention.ox.soap.types.Types.User]
@@ -485,7 +603,7 @@ class OXResourceService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 	_type_name = 'Resource'
 
 	def change(self, res):  # type: (univention.ox.soap.types.Types.Resource) -> None
-		return self._call_ox('change', res=res)
+		return self._call_ox_in_context('change', res=res)
 
 	def create(self, res):  # type: (univention.ox.soap.types.Types.Resource) -> univention.ox.soap.types.Types.Resource
 		return self._call_ox('create', res=res)
@@ -495,7 +613,7 @@ class OXResourceService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 
 	def get_data(self, res):
 		# type: (univention.ox.soap.types.Types.Resource) -> univention.ox.soap.types.Types.Resource
-		return self._call_ox('getData', res=res)
+		return self._call_ox_in_context('getData', res=res)
 
 	def get_multiple_data(self, resources):
 		# type: (List[univention.ox.soap.types.Types.Resource]) -> List[univention.ox.soap.types.Types.Resource]
@@ -533,12 +651,12 @@ class OXUserService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 
 	def change(self, user):  # type: (univention.ox.soap.types.Types.User) -> None
 		"""Manipulate user data within the given context."""
-		return self._call_ox('change', usrdata=user)
+		return self._call_ox_in_context('change', usrdata=user)
 
 	def change_by_module_access(self, user, module_access):
 		# type: (univention.ox.soap.types.Types.User, univention.ox.soap.types.Types.UserModuleAccess) -> None
 		"""Manipulate user module access within the given context."""
-		return self._call_ox('changeByModuleAccess', user=user, moduleAccess=module_access)
+		return self._call_ox_in_context('changeByModuleAccess', user=user, moduleAccess=module_access)
 
 	def change_by_module_access_name(self, user, access_combination_name):
 		# type: (univention.ox.soap.types.Types.User, str) -> None
@@ -629,7 +747,7 @@ class OXUserService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 		"""
 		Check whether the given user exists.
 		"""
-		return self._call_ox('exists', user=user)
+		return self._call_ox_in_context('exists', user=user)
 
 	def get_access_combination_name(self, user):  # type: (univention.ox.soap.types.Types.User) -> Union[str, None]
 		"""
@@ -647,7 +765,7 @@ class OXUserService(with_metaclass(OxServiceMetaClass, OxSoapService)):
 
 	def get_data(self, user):  # type: (univention.ox.soap.types.Types.User) -> None
 		"""Retrieve user objects (requires username or id)."""
-		return self._call_ox('getData', user=user)
+		return self._call_ox_in_context('getData', user=user)
 
 	def get_module_access(self, user):
 		# type: (univention.ox.soap.types.Types.User) -> univention.ox.soap.types.Types.UserModuleAccess
@@ -46,19 +46,26 @@
 #
 
 from __future__ import absolute_import
+try:
+	from typing import Any, Optional
+except ImportError:
+	pass
 
 from .config import OX_SOAP_SERVER
 from .services import get_wsdl
 
 
 # The SOAP object classes have to be fetched once through the network.
-# Doing that in __init__ to prevent network activity at import time.
+# Doing that on first access to prevent network activity at import time.
 
 
 class Types(object):
 	"""
 	See comments in the source code of this class for dict-representations of
 	the SOAP classes.
+
+	Each type is looked up on first access, only loading the WSDL of its
+	service. The WSDLs are shared by all instances.
 	"""
 	wsdl_context = None
 	wsdl_group = None
@@ -66,32 +73,50 @@ class Types(object):
 	wsdl_secondary_account = None
 	wsdl_user = None
 
+	_wsdl_attrs = {
+		'Context': 'wsdl_context',
+		'Group': 'wsdl_group',
+		'Resource': 'wsdl_resource',
+		'SecondaryAccount': 'wsdl_secondary_account',
+		'User': 'wsdl_user',
+	}
+	# name of the type -> (service with the WSDL, qualified name)
+	_types = {
+		'Credentials': ('Context', '{http://dataobjects.rmi.admin.openexchange.com/xsd}Credentials'),
+		'Context': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}Context'),
+		'Database': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}Database'),
+		'Entry': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}Entry'),
+		'Filestore': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}Filestore'),
+		'Group': ('Group', '{http://dataobjects.soap.admin.openexchange.com/xsd}Group'),
+		'Quota': ('Context', '{http://dataobjects.rmi.admin.openexchange.com/xsd}Quota'),
+		'Resource': ('Resource', '{http://dataobjects.soap.admin.openexchange.com/xsd}Resource'),
+		'SecondaryAccount': ('SecondaryAccount', '{http://dataobjects.soap.admin.openexchange.com/xsd}AccountDataOnCreate'),
+		'SchemaSelectStrategy': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}SchemaSelectStrategy'),
+		'SOAPMapEntry': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPMapEntry'),
+		'SOAPStringMap': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPStringMap'),
+		'SOAPStringMapMap': ('Context', '{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPStringMapMap'),
+		'User': ('User', '{http://dataobjects.soap.admin.openexchange.com/xsd}User'),
+		'UserModuleAccess': ('User', '{http://dataobjects.soap.admin.openexchange.com/xsd}UserModuleAccess'),
+	}
+
 	def __init__(self, server=OX_SOAP_SERVER):  # type: (Optional[str]) -> None
-		if not self.wsdl_context:
-			self.__class__.wsdl_context = get_wsdl(server, 'Context')
-		if not self.wsdl_group:
-			self.__class__.wsdl_group = get_wsdl(server, 'Group')
-		if not self.wsdl_resource:
-			self.__class__.wsdl_resource = get_wsdl(server, 'Resource')
-		if not self.wsdl_secondary_account:
-			self.__class__.wsdl_secondary_account = get_wsdl(server, 'SecondaryAccount')
-		if not self.wsdl_user:
-			self.__class__.wsdl_user = get_wsdl(server, 'User')
-		self.Credentials = self.wsdl_context.types.get_type('{http://dataobjects.rmi.admin.openexchange.com/xsd}Credentials')
-		self.Context = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Context')
-		self.Database = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Database')
-		self.Entry = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Entry')
-		self.Filestore = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Filestore')
-		self.Group = self.wsdl_group.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Group')
-		self.Quota = self.wsdl_context.types.get_type('{http://dataobjects.rmi.admin.openexchange.com/xsd}Quota')
-		self.Resource = self.wsdl_resource.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}Resource')
-		self.SecondaryAccount = self.wsdl_secondary_account.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}AccountDataOnCreate')
-		self.SchemaSelectStrategy = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}SchemaSelectStrategy')
-		self.SOAPMapEntry = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPMapEntry')
-		self.SOAPStringMap = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPStringMap')
-		self.SOAPStringMapMap = self.wsdl_context.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}SOAPStringMapMap')
-		self.User = self.wsdl_user.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}User')
-		self.UserModuleAccess = self.wsdl_user.types.get_type('{http://dataobjects.soap.admin.openexchange.com/xsd}UserModuleAccess')
+		self.server = server
+
+	def __getattr__(self, name):  # type: (str) -> Any
+		# only called for types that were not looked up yet
+		try:
+			service, qname = self._types[name]
+		except KeyError:
+			raise AttributeError('{!r} object has no attribute {!r}'.format(self.__class__.__name__, name))
+		soap_type = self.get_wsdl(service).types.get_type(qname)
+		setattr(self, name, soap_type)
+		return soap_type
+
+	def get_wsdl(self, service):  # type: (str) -> zeep.wsdl.Document
+		attr = self._wsdl_attrs[service]
+		if not getattr(self, attr):
+			setattr(self.__class__, attr, get_wsdl(self.server, service))
+		return getattr(self, attr)
 
 
 ####################################
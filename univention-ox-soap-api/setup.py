@@ -22,6 +22,7 @@ setuptools.setup(
     description="Library to access OX' SOAP API",
     url="https://www.univention.de/",
     install_requires=requirements,
+    extras_require={"async": ["aiohttp"]},  # for univention.ox.soap.async_services
     packages=["univention.ox.soap"],
     license="GNU Affero General Public License v3",
     classifiers=[